@@ -144,12 +144,20 @@ DATABASES = {
         "PASSWORD": get_env_var("DB_PASSWORD", default="safin123"),
         "HOST": get_env_var("DB_HOST", default="localhost"),
         "PORT": get_env_var("DB_PORT", default="5433"),
+        # 持久连接：复用已建立的 TCP/认证会话，避免每个请求重新握手
+        "CONN_MAX_AGE": get_env_var("DB_CONN_MAX_AGE", default="60", cast=int),
+        "CONN_HEALTH_CHECKS": True,
         # "OPTIONS": {
         #     "isolation_level": "READ COMMITTED",
         # },
     }
 }
 
+# Django ≥ 5.1 内置 PostgreSQL 连接池（需安装 psycopg[pool]，psycopg2 不支持）
+if get_env_var("DB_POOL", default="False", cast=lambda x: x.lower() in ("true", "1", "yes")):
+    DATABASES["default"].setdefault("OPTIONS", {})["pool"] = True
+    DATABASES["default"]["CONN_MAX_AGE"] = 0  # 连接池与持久连接互斥
+
 # ----------------------------
 # Password validation
 # ----------------------------
@@ -7,94 +7,185 @@
 # 3.可扩展性强：异步任务支持横向扩展，文件存储可替换为OSS，进度查询可改为WebSocket实时推送。
 # Excel导出进度提示（大文件场景，基于异步任务）
 # 核心思路：大文件导出（万级 + 日志）耗时久，采用“异步任务 + 进度查询”模式——前端发起导出请求后，后端异步执行，前端通过轮询查询进度，完成后获取下载链接，避免超时。
-import openpyxl
-from openpyxl.styles import Font, Alignment, Border, Side
-from openpyxl.utils.dataframe import dataframe_to_rows
-import pandas as pd
+import csv
+import json
+from datetime import datetime
+from io import BytesIO
+from itertools import islice
+
+from django.utils import timezone
 from lowcode.models.models import LowCodeMethodCallLog
 
+# 日志导出列（顺序即导出顺序）及中文表头
+METHOD_LOG_EXPORT_FIELDS = (
+    "id", "user__username", "model_name", "method_name",
+    "params", "result_status", "result_data", "exception_msg",
+    "call_time", "time_cost"
+)
+METHOD_LOG_EXPORT_HEADERS = {
+    "user__username": "调用用户",
+    "model_name": "模型名",
+    "method_name": "方法名",
+    "params": "调用参数",
+    "result_status": "调用结果",
+    "result_data": "返回数据",
+    "exception_msg": "异常信息",
+    "call_time": "调用时间",
+    "time_cost": "耗时（秒）"
+}
+RESULT_STATUS_CN = {"success": "成功", "fail": "失败"}
+# xlsx 单个工作表最多 1048576 行，首行为表头
+XLSX_MAX_DATA_ROWS = 1048576 - 1
+# 日志查询参数 → ORM 查询条件（按顺序 AND 组合；视图与异步导出任务共用）
+METHOD_LOG_FILTER_MAP = (
+    ("user", "user_id"),
+    ("model_name", "model_name__icontains"),
+    ("method_name", "method_name__icontains"),
+    ("result_status", "result_status"),
+    ("start_time", "call_time__gte"),
+    ("end_time", "call_time__lte"),
+)
+
 
-def generate_method_log_excel(queryset):
+def apply_method_log_filters(queryset, params):
     """
-    生成动态方法调用日志Excel文件
+    按查询参数筛选日志：所有条件合成一次 filter(**kwargs)，空值参数忽略
+    :param queryset: 日志查询集
+    :param params: 查询参数字典（键见 METHOD_LOG_FILTER_MAP）
+    :return: 筛选后的查询集（无条件时原样返回）
+    """
+    kwargs = {lookup: params[key] for key, lookup in METHOD_LOG_FILTER_MAP if params.get(key)}
+    return queryset.filter(**kwargs) if kwargs else queryset
+
+
+# Excel 列宽按列预设（write-only 模式无法写完再回头测量内容宽度）
+METHOD_LOG_EXPORT_WIDTHS = {
+    "id": 10, "user__username": 15, "model_name": 20, "method_name": 20,
+    "params": 50, "result_status": 10, "result_data": 50, "exception_msg": 50,
+    "call_time": 20, "time_cost": 12
+}
+
+
+def _excel_value(value):
+    """转换为 openpyxl 可写入的值：JSON 字段转字符串，带时区的时间转为本地无时区时间"""
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False)
+    if isinstance(value, datetime) and value.tzinfo is not None:
+        return timezone.localtime(value).replace(tzinfo=None)
+    return value
+
+
+def generate_method_log_excel(queryset, output=None, chunk_size=2000, progress_callback=None, progress_every=None,
+                              max_rows=XLSX_MAX_DATA_ROWS):
+    """
+    生成动态方法调用日志Excel文件（write-only 模式逐行写入，内存占用与导出行数无关）
     :param queryset: 日志查询集（已筛选的结果）
-    :return: Excel文件对象（BytesIO）
+    :param output: 写入目标（文件路径或可写文件对象），None 时写入新建的 BytesIO
+    :param chunk_size: 数据库游标每批读取行数
+    :param progress_callback: 进度回调，每写入 progress_every 行调用一次，参数为已写入行数
+    :param progress_every: 进度回调间隔行数，None 时等于 chunk_size
+    :param max_rows: 最多写入的数据行数，默认不超过 xlsx 单表上限
+    :return: 写入目标；output 为 None 时返回已 seek(0) 的 BytesIO
     """
-    # 1. 将查询集转为DataFrame（方便数据处理）
-    log_data = queryset.values(
-        "id", "user__username", "model_name", "method_name",
-        "params", "result_status", "result_data", "exception_msg",
-        "call_time", "time_cost"
-    )
-    df = pd.DataFrame(list(log_data))
-
-    # 2. 数据格式化
-    df.rename(columns={
-        "user__username": "调用用户",
-        "model_name": "模型名",
-        "method_name": "方法名",
-        "params": "调用参数",
-        "result_status": "调用结果",
-        "result_data": "返回数据",
-        "exception_msg": "异常信息",
-        "call_time": "调用时间",
-        "time_cost": "耗时（秒）"
-    }, inplace=True)
-
-    # 转换结果状态为中文
-    df["调用结果"] = df["调用结果"].map({"success": "成功", "fail": "失败"})
-
-    # 3. 创建Excel工作簿并设置样式
-    wb = openpyxl.Workbook()
-    ws = wb.active
-    ws.title = "动态方法调用日志"
+    # openpyxl 仅在生成 Excel 时导入：视图只用到本模块的筛选与 CSV 流式导出，Web worker 启动时无需加载
+    import openpyxl
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Font, Alignment, Border, PatternFill, Side
+    from openpyxl.utils import get_column_letter
+
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet(title="动态方法调用日志")
 
     # 定义样式（表头加粗、居中，边框）
     header_font = Font(bold=True, color="FFFFFF")
-    header_fill = openpyxl.styles.PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
+    header_fill = PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
     border = Border(
         left=Side(style="thin"), right=Side(style="thin"),
         top=Side(style="thin"), bottom=Side(style="thin")
     )
     center_alignment = Alignment(horizontal="center", vertical="center")
+    left_alignment = Alignment(horizontal="left")
+    right_alignment = Alignment(horizontal="right")
+
+    # 列宽须在写入任何行之前设置
+    for col_idx, field in enumerate(METHOD_LOG_EXPORT_FIELDS, 1):
+        ws.column_dimensions[get_column_letter(col_idx)].width = METHOD_LOG_EXPORT_WIDTHS[field]
 
-    # 4. 写入表头并设置样式
-    headers = df.columns.tolist()
-    for col_idx, header in enumerate(headers, 1):
-        cell = ws.cell(row=1, column=col_idx, value=header)
+    # 写入表头
+    header_row = []
+    for field in METHOD_LOG_EXPORT_FIELDS:
+        cell = WriteOnlyCell(ws, value=METHOD_LOG_EXPORT_HEADERS.get(field, field))
         cell.font = header_font
         cell.fill = header_fill
         cell.alignment = center_alignment
         cell.border = border
+        header_row.append(cell)
+    ws.append(header_row)
 
-    # 5. 写入数据并设置样式
-    for row_idx, row in enumerate(dataframe_to_rows(df, index=False, header=False), 2):
-        for col_idx, value in enumerate(row, 1):
-            cell = ws.cell(row=row_idx, column=col_idx, value=value)
+    # 逐批读取并写入数据（耗时列右对齐，其余左对齐）
+    status_idx = METHOD_LOG_EXPORT_FIELDS.index("result_status")
+    alignments = [right_alignment if f == "time_cost" else left_alignment for f in METHOD_LOG_EXPORT_FIELDS]
+    progress_every = progress_every or chunk_size
+    rows = queryset.values_list(*METHOD_LOG_EXPORT_FIELDS).iterator(chunk_size=chunk_size)
+    for written, row in enumerate(islice(rows, min(max_rows, XLSX_MAX_DATA_ROWS)), 1):
+        row = list(row)
+        row[status_idx] = RESULT_STATUS_CN.get(row[status_idx])
+        cells = []
+        for value, alignment in zip(row, alignments):
+            cell = WriteOnlyCell(ws, value=_excel_value(value))
             cell.border = border
-            # 耗时列右对齐
-            if headers[col_idx - 1] == "耗时（秒）":
-                cell.alignment = Alignment(horizontal="right")
-            else:
-                cell.alignment = Alignment(horizontal="left")
-
-    # 6. 自动调整列宽
-    for column in ws.columns:
-        max_length = 0
-        column_letter = column[0].column_letter
-        for cell in column:
-            try:
-                if len(str(cell.value)) > max_length:
-                    max_length = len(str(cell.value))
-            except:
-                pass
-        adjusted_width = min(max_length + 2, 50)  # 最大列宽限制为50
-        ws.column_dimensions[column_letter].width = adjusted_width
-
-    # 7. 保存到BytesIO对象
-    from io import BytesIO
-    excel_buffer = BytesIO()
-    wb.save(excel_buffer)
-    excel_buffer.seek(0)  # 重置文件指针到开头
-
-    return excel_buffer
\ No newline at end of file
+            cell.alignment = alignment
+            cells.append(cell)
+        ws.append(cells)
+        if progress_callback is not None and written % progress_every == 0:
+            progress_callback(written)
+
+    if output is None:
+        output = BytesIO()
+        wb.save(output)
+        output.seek(0)  # 重置文件指针到开头
+        return output
+
+    wb.save(output)
+    return output
+
+
+class _Echo:
+    """csv.writer 的伪文件对象：write 直接返回格式化后的行，供流式响应逐块产出"""
+
+    def write(self, value):
+        return value
+
+
+def iter_method_log_csv(queryset, max_rows=None, chunk_size=2000):
+    """
+    以 CSV 文本块流式产出方法调用日志（配合 StreamingHttpResponse 使用）
+    :param queryset: 日志查询集（已筛选的结果）
+    :param max_rows: 最多导出的行数，None 表示不限制；超出时末尾追加一行截断提示
+    :param chunk_size: 数据库游标每批读取行数，同时也是每次产出的行数
+    :return: 生成器，逐块产出 CSV 文本（首块带 UTF-8 BOM，便于 Excel 正确识别中文）
+    """
+    writer = csv.writer(_Echo())
+    yield "\ufeff" + writer.writerow(
+        [METHOD_LOG_EXPORT_HEADERS.get(f, f) for f in METHOD_LOG_EXPORT_FIELDS]
+    )
+
+    status_idx = METHOD_LOG_EXPORT_FIELDS.index("result_status")
+    rows = queryset.values_list(*METHOD_LOG_EXPORT_FIELDS).iterator(chunk_size=chunk_size)
+    if max_rows is not None:
+        # 多取一行，用于判断是否被截断
+        rows = islice(rows, max_rows + 1)
+
+    buffer = []
+    for written, row in enumerate(rows, 1):
+        if max_rows is not None and written > max_rows:
+            buffer.append(writer.writerow([f"已达到导出上限 {max_rows} 条，其余记录未导出"]))
+            break
+        row = list(row)
+        row[status_idx] = RESULT_STATUS_CN.get(row[status_idx], row[status_idx])
+        buffer.append(writer.writerow(row))
+        if len(buffer) >= chunk_size:
+            yield "".join(buffer)
+            buffer.clear()
+    if buffer:
+        yield "".join(buffer)
@@ -53,10 +53,16 @@ import logging
 from typing import Dict, List, Optional, Any, Union, Tuple, Callable
 from decimal import Decimal
 
+from asgiref.sync import sync_to_async
 from django.apps import apps
-from django.db import transaction
 from django.core.exceptions import ObjectDoesNotExist
 
+from .multi_table_transaction_service import (
+    _atomic_with_settings,
+    _get_model,
+    _is_retryable_db_error,
+)
+
 logger = logging.getLogger(__name__)
 
 
@@ -66,7 +72,6 @@ class AsyncMultiTableTransactionService:
     """
 
     @staticmethod
-    @transaction.atomic
     async def create_master_with_details(
         master_model_name: str,
         detail_model_name: str,
@@ -79,11 +84,13 @@ class AsyncMultiTableTransactionService:
         price_field_in_detail: Optional[str] = "price",
         quantity_field_in_detail: Optional[str] = "quantity",
         validate_amount_consistency: bool = True,
+        batch_size: Optional[int] = 1000,
     ):
         """
-        异步创建主表 + 子表明细（在 atomic 事务内执行）
-        注意：Django 的 transaction.atomic 不是 async-native，
-        但可在 async 函数中使用（需运行在 sync_to_async 或 ASGI 环境下）。
+        异步创建主表 + 子表明细
+        注意：Django 的 transaction.atomic 不是 async-native，直接装饰 async def
+        只会包住协程对象的创建而不会包住 await 过程，因此本方法不自带事务，
+        应通过 @async_universal_transaction 调用（由 _run_atomic_async 开启事务）。
         实际 ORM 操作必须使用 async 方法（acreate 等）。
         """
         # 1. 获取动态模型类
@@ -98,21 +105,21 @@ class AsyncMultiTableTransactionService:
         logger.debug(f"异步创建主表记录: {master_model_name} ID={master_obj.pk}")
 
         # 3. 构建子表对象（不立即保存）
-        detail_objs = []
-        for detail in detail_list:
-            detail_copy = detail.copy()
-            detail_copy[foreign_key_field] = master_obj
-            detail_objs.append(DetailModel(**detail_copy))
+        # 直接写入外键列（如 order_id），避免逐行 dict 拷贝与外键描述符校验
+        fk_attname = DetailModel._meta.get_field(foreign_key_field).attname
+        master_pk = master_obj.pk
+        detail_objs = [DetailModel(**detail) for detail in detail_list]
+        for obj in detail_objs:
+            setattr(obj, fk_attname, master_pk)
 
         # 4. 异步批量创建（Django 4.2+ 支持 abulk_create）
         try:
-            created_details = await DetailModel.objects.abulk_create(detail_objs)
+            created_details = await DetailModel.objects.abulk_create(detail_objs, batch_size=batch_size)
         except AttributeError:
-            # Django < 4.2 回退到循环 acreate（性能较低）
-            created_details = []
-            for obj in detail_objs:
-                created = await DetailModel.objects.acreate(**{f: getattr(obj, f) for f in obj._meta.fields})
-                created_details.append(created)
+            # Django < 4.2 回退到同步 bulk_create（单条 INSERT 语句，避免逐行 acreate 往返）
+            created_details = await sync_to_async(
+                DetailModel.objects.bulk_create, thread_sensitive=True
+            )(detail_objs, batch_size=batch_size)
 
         logger.debug(f"异步批量创建 {len(created_details)} 条 {detail_model_name} 记录")
 
@@ -121,10 +128,10 @@ class AsyncMultiTableTransactionService:
             if not (price_field_in_detail and quantity_field_in_detail):
                 raise ValueError("启用金额校验时，必须提供 price 和 quantity 字段名")
 
-            # 异步查询所有明细
+            # 异步分块流式读取明细，内存占用与 chunk_size 成正比而非明细总数
             details = DetailModel.objects.filter(
                 **{foreign_key_field: master_obj}
-            ).values(price_field_in_detail, quantity_field_in_detail)
+            ).values(price_field_in_detail, quantity_field_in_detail).aiterator(chunk_size=2000)
 
             total = Decimal('0.00')
             async for item in details:
@@ -163,7 +170,9 @@ def async_universal_transaction(
         "concurrent update",
         "lock timeout",
         "Lock wait timeout",
-    )
+    ),
+    isolation_level: Optional[str] = None,
+    lock_timeout: Optional[float] = None,
 ):
     """
     异步通用事务装饰器（支持超时 + 有条件重试 + 耗时统计）
@@ -172,25 +181,29 @@ def async_universal_transaction(
     :param timeout: 总超时时间（秒）
     :param retry_times: 最大重试次数
     :param retry_delay: 初始重试延迟（秒），使用指数退避
-    :param allowed_exceptions: 触发重试的异常关键词（字符串片段）
+    :param allowed_exceptions: 触发重试的异常关键词（字符串片段），仅在错误码无法识别时兜底匹配
+    :param isolation_level: 事务隔离级别，如 'READ COMMITTED' / 'SERIALIZABLE'（PostgreSQL / MySQL）
+    :param lock_timeout: 数据库级锁等待超时（秒），默认不设置（沿用数据库配置）
     """
+
     def decorator(func: Callable) -> Callable:
+        # 装饰时一次性标准化模型名为 (app_label, model_name) 元组，调用时不再重复处理
+        resolved_models = []
+        for item in model_names:
+            if isinstance(item, str):
+                resolved_models.append(("lowcode", item))
+            elif isinstance(item, tuple) and len(item) == 2:
+                resolved_models.append(item)
+            else:
+                raise ValueError(f"无效模型标识: {item}")
+        resolved_models = tuple(resolved_models)
+
         @functools.wraps(func)
         async def wrapper(*args, **kwargs) -> Any:
-            # 标准化模型名
-            resolved_models = []
-            for item in model_names:
-                if isinstance(item, str):
-                    resolved_models.append(("lowcode", item))
-                elif isinstance(item, tuple) and len(item) == 2:
-                    resolved_models.append(item)
-                else:
-                    raise ValueError(f"无效模型标识: {item}")
-
-            # 预验证模型是否存在
+            # 预验证模型是否存在（动态模型可能在运行时才注册，故在调用时检查）
             try:
                 for app_label, model_name in resolved_models:
-                    apps.get_model(app_label, model_name)
+                    _get_model(app_label, model_name)
             except LookupError as e:
                 raise ValueError(f"事务涉及模型未注册: {e}")
 
@@ -202,7 +215,11 @@ def async_universal_transaction(
                     # 使用 asyncio.wait_for 实现超时控制
                     inner_start = time.time()
                     result = await asyncio.wait_for(
-                        _run_atomic_async(func, *args, **kwargs),
+                        _run_atomic_async(
+                            func, args, kwargs,
+                            isolation_level=isolation_level,
+                            lock_timeout=lock_timeout,
+                        ),
                         timeout=timeout - (time.time() - start_time)
                     )
                     duration = time.time() - inner_start
@@ -223,9 +240,11 @@ def async_universal_transaction(
                         logger.warning("⚠️ 因总超时放弃重试")
                         break
 
-                    # 判断是否可重试
-                    err_msg = str(e).lower()
-                    retryable = any(kw.lower() in err_msg for kw in allowed_exceptions)
+                    # 判断是否可重试：优先按异常类型 + 错误码识别，关键词仅作为兜底
+                    retryable = _is_retryable_db_error(e)
+                    if not retryable and allowed_exceptions:
+                        err_msg = str(e).lower()
+                        retryable = any(kw.lower() in err_msg for kw in allowed_exceptions)
 
                     if attempt < retry_times and retryable:
                         wait = retry_delay * (2 ** attempt)  # 指数退避
@@ -250,6 +269,6 @@ def async_universal_transaction(
 
 # 辅助函数：在 transaction.atomic 中运行 async 函数
 # 注意：Django 的 atomic 是同步上下文管理器，但可在 async 中使用（需 ASGI）
-async def _run_atomic_async(func, *args, **kwargs):
-    with transaction.atomic():
+async def _run_atomic_async(func, args, kwargs, isolation_level=None, lock_timeout=None):
+    with _atomic_with_settings(isolation_level, lock_timeout):
         return await func(*args, **kwargs)
\ No newline at end of file
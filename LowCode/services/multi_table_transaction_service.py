@@ -39,12 +39,13 @@
 # 该装饰器支持传入模型类（或动态模型名）、超时、重试次数等参数
 # 内部调用你已有的 create_master_with_details 逻辑（或其他业务函数）
 # 自动处理重试、超时、日志和耗时统计
+import contextlib
 import logging
 from typing import Dict, List, Optional, Any, Tuple, Union, Callable
 from decimal import Decimal
 
 from django.apps import apps
-from django.db import transaction
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections, transaction, OperationalError
 from django.db.models import Sum, Q
 from django.core.exceptions import ObjectDoesNotExist
 import time
@@ -55,6 +56,104 @@ from django.core.exceptions import ValidationError
 logger = logging.getLogger(__name__)
 
 
+# 可重试的数据库错误码：
+# - PostgreSQL SQLSTATE: 40001 串行化失败, 40P01 死锁, 55P03 锁等待超时/NOWAIT 失败
+# - MySQL errno: 1213 死锁, 1205 锁等待超时, 3572 NOWAIT 加锁失败
+RETRYABLE_PG_CODES = frozenset({"40001", "40P01", "55P03"})
+RETRYABLE_MYSQL_ERRNOS = frozenset({1213, 1205, 3572})
+
+
+def _is_retryable_db_error(e: BaseException) -> bool:
+    """按异常类型 + 驱动错误码判断是否为可重试的并发冲突（不依赖本地化的错误消息）"""
+    if not isinstance(e, OperationalError):
+        return False
+    cause = e.__cause__
+    # psycopg2 使用 pgcode，psycopg3 使用 sqlstate
+    code = getattr(cause, "pgcode", None) or getattr(cause, "sqlstate", None)
+    if code in RETRYABLE_PG_CODES:
+        return True
+    return bool(e.args) and e.args[0] in RETRYABLE_MYSQL_ERRNOS
+
+
+# 允许的事务隔离级别（白名单，避免拼接 SQL 注入）
+ISOLATION_LEVELS = frozenset({
+    "READ UNCOMMITTED", "READ COMMITTED", "REPEATABLE READ", "SERIALIZABLE",
+})
+
+
+def _apply_transaction_settings(conn, isolation_level: Optional[str], lock_timeout: Optional[float]):
+    """
+    在已进入的 atomic 块开头设置隔离级别与锁等待超时。
+
+    :return: MySQL 下设置锁等待超时前的会话原值（供退出后恢复），其余情况为 None
+    """
+    vendor = conn.vendor
+    if vendor not in ("postgresql", "mysql"):
+        return None
+
+    previous_wait = None
+    with conn.cursor() as cursor:
+        if isolation_level:
+            # 必须是事务内第一条语句
+            cursor.execute(f"SET TRANSACTION ISOLATION LEVEL {isolation_level}")
+
+        if lock_timeout and lock_timeout > 0:
+            if vendor == "postgresql":
+                timeout_ms = f"{int(lock_timeout * 1000)}ms"
+                # set_config(..., true) 等价于 SET LOCAL，事务结束后自动恢复
+                cursor.execute("SELECT set_config('lock_timeout', %s, true)", [timeout_ms])
+                cursor.execute("SELECT set_config('statement_timeout', %s, true)", [timeout_ms])
+            else:
+                # MySQL 无 SET LOCAL：记下会话原值，退出事务后恢复；单位为秒（最小 1）
+                cursor.execute("SELECT @@innodb_lock_wait_timeout")
+                previous_wait = cursor.fetchone()[0]
+                cursor.execute("SET innodb_lock_wait_timeout = %s", [max(1, int(lock_timeout))])
+    return previous_wait
+
+
+@contextlib.contextmanager
+def _atomic_with_settings(
+        isolation_level: Optional[str] = None,
+        lock_timeout: Optional[float] = None,
+        using: str = DEFAULT_DB_ALIAS,
+):
+    """
+    进入 transaction.atomic(using=using)，并在事务开头设置隔离级别与锁等待超时。
+
+    让数据库在 lock_timeout 内主动中止锁等待/死锁，而不是等 Python 层超时，
+    从而缩短锁持有时间，使重试的事务不再与冲突事务并发。
+    隔离级别只在最外层事务设置：嵌套在外层 atomic 中时已有语句执行，无法再切换。
+    """
+    level = None
+    if isolation_level:
+        level = isolation_level.upper()
+        if level not in ISOLATION_LEVELS:
+            raise ValueError(f"不支持的事务隔离级别: {isolation_level}")
+
+    conn = connections[using]
+    outermost = not conn.in_atomic_block
+    previous_wait = None
+    try:
+        with transaction.atomic(using=using):
+            previous_wait = _apply_transaction_settings(
+                conn, level if outermost else None, lock_timeout
+            )
+            yield
+    finally:
+        if previous_wait is not None:
+            try:
+                with conn.cursor() as cursor:
+                    cursor.execute("SET innodb_lock_wait_timeout = %s", [previous_wait])
+            except DatabaseError as e:
+                logger.warning(f"恢复 innodb_lock_wait_timeout 失败: {e}")
+
+
+@functools.lru_cache(maxsize=None)
+def _get_model(app_label: str, model_name: str):
+    """缓存 apps.get_model 结果，避免装饰器每次调用都遍历应用注册表"""
+    return apps.get_model(app_label, model_name)
+
+
 class MultiTableTransactionService:
     """
     通用多表事务服务类：
@@ -78,6 +177,7 @@ class MultiTableTransactionService:
         price_field_in_detail: Optional[str] = "price",
         quantity_field_in_detail: Optional[str] = "quantity",
         validate_amount_consistency: bool = True,
+        batch_size: Optional[int] = 1000,
     ):
         """
         创建主表记录 + 批量子表明细（通用多表事务）
@@ -93,6 +193,7 @@ class MultiTableTransactionService:
         :param price_field_in_detail: 子表明细单价字段
         :param quantity_field_in_detail: 子表明细数量字段
         :param validate_amount_consistency: 是否校验总金额一致性
+        :param batch_size: 子表批量插入每批行数（避免超出参数上限、缩短锁持有时间），None 表示由数据库后端决定
         :return: 创建成功的主表对象
         """
         # 1. 获取动态模型类
@@ -107,15 +208,15 @@ class MultiTableTransactionService:
         logger.debug(f"创建主表记录: {master_model_name} ID={master_obj.pk}")
 
         # 3. 构建子表对象列表（设置外键）
-        detail_objs = []
-        for detail in detail_list:
-            detail_copy = detail.copy()
-            # 设置外键：如 order=master_obj
-            detail_copy[foreign_key_field] = master_obj
-            detail_objs.append(DetailModel(**detail_copy))
+        # 直接写入外键列（如 order_id），避免逐行 dict 拷贝与外键描述符校验
+        fk_attname = DetailModel._meta.get_field(foreign_key_field).attname
+        master_pk = master_obj.pk
+        detail_objs = [DetailModel(**detail) for detail in detail_list]
+        for obj in detail_objs:
+            setattr(obj, fk_attname, master_pk)
 
         # 4. 批量创建子表记录
-        created_details = DetailModel.objects.bulk_create(detail_objs)
+        created_details = DetailModel.objects.bulk_create(detail_objs, batch_size=batch_size)
         logger.debug(f"批量创建 {len(created_details)} 条 {detail_model_name} 记录")
 
         # 5. 【可选】校验金额一致性
@@ -199,37 +300,47 @@ def sync_universal_transaction(
         timeout: float = 5.0,
         retry_times: int = 2,
         retry_delay: float = 0.5,
-        isolation_level: str = None  # 如需扩展可加，此处暂不实现 DB 级隔离设置
+        isolation_level: Optional[str] = None,
+        lock_timeout: Optional[float] = None,
+        using: str = DEFAULT_DB_ALIAS,
 ):
     """
     同步通用事务装饰器（支持超时 + 重试 + 耗时统计）
 
+    每次重试都会重新进入 transaction.atomic(using=using)。为避免死锁风暴时频繁建连，
+    建议为该数据库别名开启连接池：Django ≥ 5.1 + psycopg 3 下设置
+    DATABASES[using]['OPTIONS']['pool'] = True（本项目可通过环境变量 DB_POOL=true 开启）；
+    Django < 5.1 可使用 django-postgrespool2。
+
     :param model_names: 模型标识列表，支持：
         - 字符串: "SalesOrder" → 默认 app='lowcode'
         - 元组: ("myapp", "Order")
     :param timeout: 事务最大执行时间（秒），超时则中断并回滚
-    :param retry_times: 失败后重试次数（仅对数据库冲突类异常重试）
+    :param retry_times: 失败后重试次数（仅对死锁、串行化失败、锁等待超时等 OperationalError 重试）
     :param retry_delay: 重试间隔（秒）
-    :param isolation_level: （预留）事务隔离级别，如 'READ COMMITTED'
+    :param isolation_level: 事务隔离级别，如 'READ COMMITTED' / 'SERIALIZABLE'（PostgreSQL / MySQL）
+    :param lock_timeout: 数据库级锁等待超时（秒），默认不设置（沿用数据库配置）
+    :param using: 数据库别名，默认 'default'
     """
 
     def decorator(func: Callable) -> Callable:
+        # 装饰时一次性标准化模型名为 (app_label, model_name) 元组，调用时不再重复处理
+        resolved_models = []
+        for item in model_names:
+            if isinstance(item, str):
+                resolved_models.append(("lowcode", item))
+            elif isinstance(item, tuple) and len(item) == 2:
+                resolved_models.append(item)
+            else:
+                raise ValueError(f"无效的模型标识: {item}")
+        resolved_models = tuple(resolved_models)
+
         @functools.wraps(func)
         def wrapper(*args, **kwargs) -> Any:
-            # 标准化 model_names 为 (app_label, model_name) 列表
-            resolved_models = []
-            for item in model_names:
-                if isinstance(item, str):
-                    resolved_models.append(("lowcode", item))
-                elif isinstance(item, tuple) and len(item) == 2:
-                    resolved_models.append(item)
-                else:
-                    raise ValueError(f"无效的模型标识: {item}")
-
-            # 预加载模型（提前验证是否存在）
+            # 预验证模型是否存在（动态模型可能在运行时才注册，故在调用时检查）
             try:
                 for app_label, model_name in resolved_models:
-                    apps.get_model(app_label, model_name)
+                    _get_model(app_label, model_name)
             except LookupError as e:
                 raise ValueError(f"事务涉及的模型未注册: {e}")
 
@@ -239,7 +350,7 @@ def sync_universal_transaction(
             for attempt in range(retry_times + 1):
                 try:
                     # 使用独立事务块（避免外层干扰）
-                    with transaction.atomic():
+                    with _atomic_with_settings(isolation_level, lock_timeout, using):
                         # 记录子事务开始时间
                         inner_start = time.time()
                         result = func(*args, **kwargs)
@@ -268,14 +379,8 @@ def sync_universal_transaction(
                         logger.warning("⚠️ 事务因超时放弃重试")
                         break
 
-                    # 可重试的数据库异常（根据实际 DB 调整）
-                    retryable = any(
-                        msg in str(e)
-                        for msg in [
-                            "deadlock", "Deadlock", "could not serialize",
-                            "concurrent update", "lock", "timeout"
-                        ]
-                    )
+                    # 可重试的数据库异常：死锁 / 串行化失败 / 锁等待超时
+                    retryable = _is_retryable_db_error(e)
 
                     if attempt < retry_times and retryable:
                         wait = retry_delay * (2 ** attempt)  # 指数退避（可选）
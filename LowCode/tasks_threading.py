@@ -1,15 +1,23 @@
 # lowcode/api/tasks_celery.py
 """
 线程版异步模型升级任务（ 仅适用于开发或单机部署！）
-进程重启后任务状态会丢失，生产环境请使用 Celery + DB 持久化方案。
+任务状态持久化在 ModelUpgradeRecord 中，但进程重启时正在执行的任务会中断，
+生产环境请使用 Celery 方案。
 """
 
-import threading
+import atexit
 import logging
+from concurrent.futures import ThreadPoolExecutor
 import json
 import uuid
 from typing import Any, Dict, List
 
+try:
+    import orjson
+except ImportError:  # 可选依赖，缺失时回退到标准库 json
+    orjson = None
+
+from django.core.cache import cache
 from django.core.management import call_command
 from django.core.management.base import CommandError
 from django.contrib.auth.models import User
@@ -17,22 +25,31 @@ from lowcode.models.models import ModelUpgradeRecord
 
 logger = logging.getLogger(__name__)
 
-# 内存任务状态（非持久化，仅用于快速查询）
-_TASK_STATUS: Dict[str, Dict[str, Any]] = {}
+# 复用的后台线程池：限制并发升级数量，避免每个任务新建线程
+_UPGRADE_POOL = ThreadPoolExecutor(max_workers=4, thread_name_prefix="model-upgrade")
+atexit.register(_UPGRADE_POOL.shutdown, wait=False)
+
+# 任务状态短时缓存（秒），降低轮询接口对 DB 的压力
+_TASK_STATUS_CACHE_TIMEOUT = 2
+
+
+def _task_status_cache_key(task_id: str) -> str:
+    return f"lowcode:upgrade_task:{task_id}"
 
 
 def _run_upgrade(model_name: str, fields: List[Dict[str, Any]], task_id: str, user_id: int, **options) -> None:
     """
-    在子线程中执行模型升级命令，并同步更新 DB 记录与内存状态。
+    在子线程中执行模型升级命令，并同步更新 DB 记录。
     """
     try:
-        # 更新数据库记录为 running
-        record = ModelUpgradeRecord.objects.get(task_id=task_id)
-        record.status = 'running'
-        record.save(update_fields=['status'])
+        # 更新数据库记录为 running（直接 UPDATE，无需先 SELECT 整行）
+        ModelUpgradeRecord.objects.filter(task_id=task_id).update(status=ModelUpgradeRecord.STATUS_RUNNING)
 
         # 执行管理命令
-        fields_json = json.dumps(fields, ensure_ascii=False)
+        if orjson is not None:
+            fields_json = orjson.dumps(fields).decode()  # orjson 默认输出 UTF-8，等价于 ensure_ascii=False
+        else:
+            fields_json = json.dumps(fields, ensure_ascii=False)
         call_command(
             'upgrade_model',
             model_name,
@@ -44,12 +61,8 @@ def _run_upgrade(model_name: str, fields: List[Dict[str, Any]], task_id: str, us
         )
 
         # 升级成功
-        record.status = 'success'
-        record.save(update_fields=['status'])
-        _TASK_STATUS[task_id] = {
-            "status": "success",
-            "message": f"模型 {model_name} 升级成功"
-        }
+        ModelUpgradeRecord.objects.filter(task_id=task_id).update(status=ModelUpgradeRecord.STATUS_SUCCESS)
+        cache.delete(_task_status_cache_key(task_id))
         logger.info(f"[OK] 模型升级成功: task_id={task_id}, model={model_name}, user_id={user_id}")
 
     except CommandError as e:
@@ -65,19 +78,14 @@ def _run_upgrade(model_name: str, fields: List[Dict[str, Any]], task_id: str, us
 
 def _handle_failure(task_id: str, error_msg: str, model_name: str) -> None:
     """统一处理失败逻辑"""
-    try:
-        record = ModelUpgradeRecord.objects.get(task_id=task_id)
-        record.status = 'failed'
-        record.error_message = error_msg
-        record.save(update_fields=['status', 'error_message'])
-    except ModelUpgradeRecord.DoesNotExist:
+    updated = ModelUpgradeRecord.objects.filter(task_id=task_id).update(
+        status=ModelUpgradeRecord.STATUS_FAILED,
+        error_message=error_msg,
+    )
+    if not updated:
         logger.warning(f"[WARNING] 任务记录不存在，无法更新失败状态: task_id={task_id}")
 
-    _TASK_STATUS[task_id] = {
-        "status": "failed",
-        "error": error_msg,
-        "model_name": model_name
-    }
+    cache.delete(_task_status_cache_key(task_id))
 
 
 def async_upgrade_model_task(
@@ -87,9 +95,9 @@ def async_upgrade_model_task(
     **options
 ) -> str:
     """
-    启动一个后台线程执行模型升级，并返回任务 ID。
+    将模型升级提交到后台线程池执行，并返回任务 ID。
 
-    ⚠️ 注意：此实现不支持进程重启后的状态恢复，仅推荐用于开发环境！
+    ⚠️ 注意：进程重启会中断正在执行的任务，仅推荐用于开发环境！
 
     :param model_name: 动态模型名称
     :param fields: 字段定义列表（已校验）
@@ -111,17 +119,13 @@ def async_upgrade_model_task(
         force=options.get('force', False),
     )
 
-    # 初始化内存状态
-    _TASK_STATUS[task_id] = {"status": "pending"}
-
-    # 启动后台线程
-    thread = threading.Thread(
-        target=_run_upgrade,
-        args=(model_name, fields, task_id, user_id),
-        kwargs=options,
-        daemon=True  # 主线程退出时自动销毁
-    )
-    thread.start()
+    # 提交到后台线程池（超出并发上限的任务排队等待）
+    try:
+        _UPGRADE_POOL.submit(_run_upgrade, model_name, fields, task_id, user_id, **options)
+    except RuntimeError as e:
+        # 解释器关闭期间线程池已停止，不再接受新任务
+        _handle_failure(task_id, f"任务提交失败: {e}"[:500], model_name)
+        logger.error(f"[ERROR] 线程池已关闭，无法提交任务 task_id={task_id}: {e}")
 
     logger.debug(f"[DEBUG] 已启动模型升级任务: task_id={task_id}, model={model_name}")
     return task_id
@@ -129,8 +133,24 @@ def async_upgrade_model_task(
 
 def get_task_status(task_id: str) -> Dict[str, Any]:
     """
-    获取任务状态（从内存字典读取）。
+    获取任务状态（从 ModelUpgradeRecord 读取，进程重启后仍可查询）。
 
-     进程重启后所有状态丢失！生产环境应查询 ModelUpgradeRecord 数据库表。
+    结果会短时缓存，便于前端高频轮询。
     """
-    return _TASK_STATUS.get(task_id, {"status": "not_found", "task_id": task_id})
\ No newline at end of file
+    def _load() -> Dict[str, Any]:
+        record = (
+            ModelUpgradeRecord.objects
+            .only('task_id', 'model_name', 'status', 'error_message')
+            .filter(task_id=task_id)
+            .first()
+        )
+        if record is None:
+            return {"status": "not_found", "task_id": task_id}
+        return {
+            "task_id": record.task_id,
+            "model_name": record.model_name,
+            "status": record.status,
+            "error_message": record.error_message,
+        }
+
+    return cache.get_or_set(_task_status_cache_key(task_id), _load, timeout=_TASK_STATUS_CACHE_TIMEOUT)
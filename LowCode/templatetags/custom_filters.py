@@ -2,12 +2,20 @@
 from django import template
 from django.utils.html import escape, format_html, mark_safe
 from django.core.files.storage import default_storage
-from django.db.models import NOT_PROVIDED, Model
+from django.core.exceptions import FieldError
+from django.db import models
+from django.db.models import NOT_PROVIDED, Model, QuerySet, Sum
+from django.forms import BoundField
+from django.utils.formats import date_format
 from datetime import datetime, date, time
 from decimal import Decimal
+import builtins
 import logging
+import operator
 import os
-from functools import reduce
+import sys
+from functools import lru_cache
+from types import MappingProxyType
 from django.urls import reverse
 
 
@@ -17,7 +25,8 @@ logger = logging.getLogger(__name__)
 register = template.Library()
 
 # 字段类型中文映射（与视图保持一致）
-FIELD_TYPE_CN_MAP = {
+# 只读映射 + 驻留字符串键：与 type(field).__name__ 比较时可走指针相等
+FIELD_TYPE_CN_MAP = MappingProxyType({sys.intern(k): v for k, v in {
     'CharField': '字符串',
     'TextField': '文本',
     'BooleanField': '布尔值',
@@ -35,9 +44,78 @@ FIELD_TYPE_CN_MAP = {
     'ForeignKey': '外键',
     'ManyToManyField': '多对多',
     'AutoField': '自增ID'
+}.items()})
+
+
+# 属性缺失哨兵
+_MISSING = object()
+
+# get_field_value 使用的静态/半静态 HTML 片段（模块加载时构建一次）
+_EMPTY_BADGE = '<span class="status-badge badge-default">-</span>'
+_TRUE_BADGE = '<span class="status-badge badge-success">启用</span>'
+_FALSE_BADGE = '<span class="status-badge badge-danger">禁用</span>'
+_DATE_TMPL = '<span class="date-value text-muted">{}</span>'.format
+_NUMBER_TMPL = '<span class="text-info">{}</span>'.format
+
+
+def _render_bool(value):
+    return _TRUE_BADGE if value else _FALSE_BADGE
+
+
+def _render_datetime(value):
+    return _DATE_TMPL(value.strftime("%Y-%m-%d %H:%M:%S"))
+
+
+def _render_date(value):
+    return _DATE_TMPL(value.strftime("%Y-%m-%d"))
+
+
+def _render_time(value):
+    return _DATE_TMPL(value.strftime("%H:%M:%S"))
+
+
+def _render_int(value):
+    return _NUMBER_TMPL(f"{value:,}" if abs(value) >= 1000 else str(value))
+
+
+def _render_decimal(value):
+    return _NUMBER_TMPL(f"{value:.2f}")
+
+
+# 与字段定义无关的标量类型及其渲染函数
+_SCALAR_RENDERERS = {
+    bool: _render_bool,
+    datetime: _render_datetime,
+    date: _render_date,
+    time: _render_time,
+    int: _render_int,
+    float: _render_decimal,
+    Decimal: _render_decimal,
 }
 
 
+@lru_cache(maxsize=256)
+def _scalar_renderer(value_type):
+    """按值类型的 MRO 查找渲染函数并缓存（子类命中最近的父类，如 datetime 先于 date、bool 先于 int）"""
+    for klass in value_type.__mro__:
+        renderer = _SCALAR_RENDERERS.get(klass)
+        if renderer is not None:
+            return renderer
+    return None
+
+
+@lru_cache(maxsize=256)
+def _fields_by_name(model_cls):
+    """按模型类缓存 {字段名: 字段实例}，查找不存在的字段时无需抛出/捕获异常"""
+    return {f.name: f for f in model_cls._meta.get_fields()}
+
+
+@lru_cache(maxsize=4096)
+def _field_getter(field_name):
+    """将 Django 风格的 'a__b__c' 路径编译为 C 实现的 attrgetter('a.b.c')"""
+    return operator.attrgetter(field_name.replace('__', '.'))
+
+
 @register.filter(name='replace')
 def replace_filter(value, args):
     """
@@ -59,41 +137,25 @@ def widget_type_filter(widget):
 def get_field_value_filter(obj, field_name):
     """适配所有字段类型的值格式化，优化版"""
     if not obj or not isinstance(field_name, str) or not field_name.strip():
-        return '<span class="status-badge badge-default">-</span>'
+        return _EMPTY_BADGE
 
     field_name = field_name.strip()
+    parts = field_name.split('__')
     try:
-        value = reduce(getattr, field_name.split('__'), obj)
+        value = _field_getter(field_name)(obj)
     except (AttributeError, TypeError):
-        return '<span class="status-badge badge-default">-</span>'
+        return _EMPTY_BADGE
 
     if value in (None, NOT_PROVIDED, ""):
-        return '<span class="status-badge badge-default">-</span>'
+        return _EMPTY_BADGE
 
-    # 布尔字段
-    if isinstance(value, bool):
-        status_text = "启用" if value else "禁用"
-        badge_class = "badge-success" if value else "badge-danger"
-        return f'<span class="status-badge {badge_class}">{status_text}</span>'
-
-    # 日期时间相关字段
-    datetime_formats = {
-        datetime: "%Y-%m-%d %H:%M:%S",
-        date: "%Y-%m-%d",
-        time: "%H:%M:%S"
-    }
-    for cls, fmt in datetime_formats.items():
-        if isinstance(value, cls):
-            formatted_value = value.strftime(fmt)
-            return f'<span class="date-value text-muted">{formatted_value}</span>'
+    # 布尔、日期时间、数字等标量类型
+    renderer = _scalar_renderer(type(value))
+    if renderer is not None:
+        return renderer(value)
 
-    # 尝试获取字段实例（缓存结果提升性能）
-    field_instance = None
-    try:
-        if hasattr(obj, '_meta'):
-            field_instance = obj._meta.get_field(field_name.split('__')[0])
-    except Exception:
-        pass
+    # 获取字段实例（计算属性、注解等非字段名返回 None，走普通值分支）
+    field_instance = _fields_by_name(type(obj)).get(parts[0]) if isinstance(obj, Model) else None
 
     # 字符串相关字段
     if isinstance(value, str):
@@ -105,18 +167,10 @@ def get_field_value_filter(obj, field_name):
             short_uuid = f"{str(value)[:8]}..." if len(str(value)) > 12 else str(value)
             return f'<span title="{escape(str(value))}">{short_uuid}</span>'
         else:
-            stripped_value = value.strip().replace('\n', '<br>')
+            stripped_value = value.strip()
             if len(stripped_value) > 50:
-                return f'<span class="truncate-text" title="{escape(stripped_value.replace("<br>", " "))}">{escape(stripped_value[:50])}...</span>'
-            return stripped_value
-
-    # 数字相关字段
-    if isinstance(value, (int, float, Decimal)):
-        if isinstance(value, (float, Decimal)):
-            formatted_value = f"{value:.2f}"
-        else:
-            formatted_value = f"{value:,}" if abs(value) >= 1000 else str(value)
-        return f'<span class="text-info">{formatted_value}</span>'
+                return f'<span class="truncate-text" title="{escape(stripped_value.replace(chr(10), " "))}">{escape(stripped_value[:50])}...</span>'
+            return escape(stripped_value).replace('\n', '<br>')
 
     # 外键字段
     if field_instance and isinstance(field_instance, models.ForeignKey):
@@ -128,16 +182,21 @@ def get_field_value_filter(obj, field_name):
                 return f'<a href="{url}" class="text-info">{escape(str(related_obj))}</a>'
             except Exception:
                 return f'<span class="text-secondary">{escape(str(related_obj))}</span>'
-        return '<span class="status-badge badge-default">-</span>'
+        return _EMPTY_BADGE
 
     # 多对多字段
+    # 列表视图应对 M2M 字段调用 .prefetch_related(field_name)，此时 value.all() 直接命中预取缓存，不产生查询
     if field_instance and isinstance(field_instance, models.ManyToManyField):
-        related_objs = value.all() if hasattr(value, 'all') else []
-        tags = [f'<span class="badge bg-secondary">{escape(str(rel_obj))}</span>' for rel_obj in related_objs[:5]]
-        total = related_objs.count()
-        if total > 5:
+        if not hasattr(value, 'all'):
+            return _EMPTY_BADGE
+        related_objs = value.all()
+        # 多取 1 条（LIMIT 6）判断是否溢出，仅在溢出时才需要精确总数
+        items = list(related_objs[:6])
+        tags = [f'<span class="badge bg-secondary">{escape(str(rel_obj))}</span>' for rel_obj in items[:5]]
+        if len(items) > 5:
+            total = related_objs.count()
             tags.append(f'<span class="badge bg-light text-dark">+{total - 5}</span>')
-        return " ".join(tags) if tags else '<span class="status-badge badge-default">-</span>'
+        return " ".join(tags) if tags else _EMPTY_BADGE
 
     # 文件/图片字段
     if field_instance and isinstance(field_instance, (models.FileField, models.ImageField)):
@@ -151,7 +210,7 @@ def get_field_value_filter(obj, field_name):
             except Exception as e:
                 logger.warning(f"Failed to access file: {e}")
                 return f'<span class="text-warning" title="文件访问失败">{escape(file_name)}</span>'
-        return '<span class="status-badge badge-default">-</span>'
+        return _EMPTY_BADGE
 
     return escape(str(value))
 
@@ -171,17 +230,19 @@ def add_class(field, css_class):
     return field.as_widget()
 
 
-@register.filter
-def get_field_display_info(obj, field_name):
-    """返回字段的结构化显示信息，供模板安全渲染"""
-    # 省略以保持简洁，您可以根据需要添加此函数的具体实现
-    pass
-
-
-@register.filter
-def sum(queryset, attr):
-    """计算查询集指定属性的总和"""
-    return sum(getattr(item, attr, 0) for item in queryset)
+@register.filter(name='sum')
+def sum_attr(queryset, attr):
+    """
+    计算查询集指定属性的总和
+    - QuerySet 且 attr 为数据库字段：一条 SUM 聚合 SQL，不实例化模型
+    - 其他可迭代对象（或 attr 为计算属性）：Python 端累加
+    """
+    if isinstance(queryset, QuerySet):
+        try:
+            return queryset.aggregate(_total=Sum(attr))['_total'] or 0
+        except FieldError:
+            pass
+    return builtins.sum(getattr(item, attr, 0) or 0 for item in queryset)
 
 
 @register.filter
@@ -190,8 +251,6 @@ def divide(value, divisor):
     return value / divisor if divisor != 0 else 0
 
 
-
-
 @register.filter
 def get_field_display_info(obj, field_name):
     """
@@ -309,31 +368,8 @@ def rejectattr(items, attr_name):
     """
     if not items:
         return []
-    return [item for item in items if not hasattr(item, attr_name) or not getattr(item, attr_name)]
-
-
-@register.filter(name='rejectattr_equal')
-def rejectattr_equal(items, attr_value):
-    """
-    过滤掉指定属性等于特定值的项目
-    用法: {{ items|rejectattr_equal:"some_attr:value" }}
-    """
-    if not items or ':' not in attr_value:
-        return []
-
-    attr_name, value = attr_value.split(':', 1)
-    return [item for item in items if not hasattr(item, attr_name) or getattr(item, attr_name) != value]
-
-
-@register.filter(name='rejectattr')
-def rejectattr(items, attr_name):
-    """
-    过滤掉具有指定属性的项目
-    用法: {{ items|rejectattr:"some_attr" }}
-    """
-    if not items:
-        return []
-    return [item for item in items if not hasattr(item, attr_name) or not getattr(item, attr_name)]
+    # 缺失属性与假值同等对待，单次 getattr 即可判断
+    return [item for item in items if not getattr(item, attr_name, None)]
 
 
 @register.filter(name='rejectattr_equal')
@@ -346,7 +382,8 @@ def rejectattr_equal(items, attr_value):
         return []
 
     attr_name, value = attr_value.split(':', 1)
-    return [item for item in items if not hasattr(item, attr_name) or getattr(item, attr_name) != value]
+    # 缺失属性时返回哨兵对象，必然不等于 value，从而保留该项
+    return [item for item in items if getattr(item, attr_name, _MISSING) != value]
 
 
 # 添加 list 过滤器
@@ -373,7 +410,9 @@ def list_join(items, separator=','):
     """
     if not items:
         return ""
-    # 确保是列表
-    items = to_list(items)
-    # 转换所有项为字符串
-    return separator.join(str(item) for item in items if item is not None)
+    # 直接迭代原对象（QuerySet/生成器等）一次完成拼接，不再先物化为中间列表
+    try:
+        iterator = iter(items)
+    except TypeError:
+        return str(items)
+    return separator.join([str(item) for item in iterator if item is not None])
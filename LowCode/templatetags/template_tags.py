@@ -1,25 +1,37 @@
 # lowcode/templatetags/template_tags.py
+from functools import lru_cache
+
 from django import template
+from django.conf import settings
 from django.template.loader import get_template, TemplateDoesNotExist
 
 register = template.Library()
 
 
-@register.simple_tag
-def get_template_exists(template_name, as_var=None):
+@lru_cache(maxsize=512)
+def _template_exists(template_name):
+    """缓存模板是否存在的判断结果，避免每次渲染都遍历模板加载器"""
+    try:
+        get_template(template_name)
+        return True
+    except TemplateDoesNotExist:
+        return False
+
+
+@register.simple_tag(takes_context=True)
+def get_template_exists(context, template_name, as_var=None):
     """
     自定义标签：判断模板是否存在（支持赋值给变量）
     使用方式：{% get_template_exists "xxx.html" as var_name %}
     """
-    try:
-        get_template(template_name)
-        result = True
-    except TemplateDoesNotExist:
-        result = False
+    # DEBUG 下不走缓存，便于开发时新增/删除模板立即生效
+    if settings.DEBUG:
+        result = _template_exists.__wrapped__(template_name)
+    else:
+        result = _template_exists(template_name)
 
-    # 赋值给模板变量
+    # 赋值给模板变量（兼容以参数形式传入变量名的旧用法）
     if as_var:
-        context = template.RequestContext(template.Variable('request').resolve(template.Context()))
         context[as_var] = result
         return ''
-    return result
\ No newline at end of file
+    return result
@@ -1,7 +1,9 @@
 # lowcode/templatetags/vite.py
-import os
+import functools
 from django import template
 from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
 from django.templatetags.static import static
 from django.utils.safestring import mark_safe
 from lowcode.utils.vite import get_vite_asset
@@ -9,6 +11,27 @@ from lowcode.utils.vite import get_vite_asset
 register = template.Library()
 
 
+@functools.lru_cache(maxsize=32)
+def _build_entry_tags(entry_name: str) -> str:
+    """生成生产模式下某入口的 <link>/<script> 片段（每个入口只拼接一次）"""
+    assets = get_vite_asset(
+        app_name="lowcode_designer",
+        entry_key=entry_name,
+        dev_fallback=None  # 生产环境不用 fallback
+    )
+    tags = []
+    for css in assets.get('css', []):
+        tags.append(f'<link rel="stylesheet" href="{static(css)}">')
+    tags.append(f'<script type="module" src="{static(assets["js"])}"></script>')
+    return '\n'.join(tags)
+
+
+@receiver(setting_changed)
+def _clear_entry_tags_cache(*, setting, **kwargs):
+    if setting in ("DEBUG", "STATIC_URL", "STATIC_ROOT", "STATICFILES_DIRS", "VITE_MANIFEST_RELOAD"):
+        _build_entry_tags.cache_clear()
+
+
 @register.simple_tag
 def vite_entry(entry_name='src/main.js'):
     """
@@ -28,16 +51,9 @@ def vite_entry(entry_name='src/main.js'):
 
     # === 生产模式：使用构建产物 ===
     try:
-        assets = get_vite_asset(
-            app_name="lowcode_designer",
-            entry_key=entry_name,
-            dev_fallback=None  # 生产环境不用 fallback
-        )
-        tags = []
-        for css in assets.get('css', []):
-            tags.append(f'<link rel="stylesheet" href="{static(css)}">')
-        tags.append(f'<script type="module" src="{static(assets["js"])}"></script>')
-        return mark_safe('\n'.join(tags))
+        if getattr(settings, 'VITE_MANIFEST_RELOAD', False):
+            _build_entry_tags.cache_clear()
+        return mark_safe(_build_entry_tags(entry_name))
 
     except Exception as e:
         # 开发阶段抛出错误便于调试，生产环境可根据需要改为静默或记录日志
@@ -16,8 +16,49 @@
 # #   'user': 'myuser',
 # #   'password': 'secret'
 # # }
+import os
+from functools import lru_cache
+from pathlib import Path
+
 from django.conf import settings
-from typing import Dict, Any
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from typing import Dict, Any, Optional, Tuple
+
+# 常见 Django ENGINE 字符串 → (vendor, 默认端口)，精确匹配一次字典查找即可
+_ENGINE_VENDOR: Dict[str, Tuple[str, Optional[int]]] = {
+    "django.db.backends.postgresql": ("postgresql", 5432),
+    "django.db.backends.postgresql_psycopg2": ("postgresql", 5432),
+    "django.contrib.gis.db.backends.postgis": ("postgresql", 5432),
+    "django.db.backends.mysql": ("mysql", 3306),
+    "django.contrib.gis.db.backends.mysql": ("mysql", 3306),
+    "django.db.backends.sqlite3": ("sqlite", None),
+    "django.contrib.gis.db.backends.spatialite": ("sqlite", None),
+}
+
+
+def _resolve_vendor(engine: str) -> Tuple[str, Optional[int]]:
+    """解析 ENGINE 对应的 vendor 与默认端口；未知（第三方）后端回退到子串匹配"""
+    resolved = _ENGINE_VENDOR.get(engine)
+    if resolved is not None:
+        return resolved
+
+    engine = engine.lower()
+    if "postgresql" in engine:
+        return "postgresql", 5432
+    elif "mysql" in engine:
+        return "mysql", 3306
+    elif "mariadb" in engine:
+        return "mariadb", 3306
+    elif "sqlite" in engine:
+        return "sqlite", None  # SQLite 不需要端口
+    raise ValueError(f"Unsupported database engine: {engine}")
+
+
+@receiver(setting_changed)
+def _clear_db_config_cache(*, setting, **kwargs):
+    if setting == "DATABASES":
+        _build_db_config.cache_clear()
 
 
 def get_db_config(alias: str = "default") -> Dict[str, Any]:
@@ -42,27 +83,17 @@ def get_db_config(alias: str = "default") -> Dict[str, Any]:
         KeyError: 如果 DATABASES 中不存在该 alias
         ValueError: 如果 ENGINE 无法识别
     """
+    # settings.DATABASES 运行期不变，结果按 alias 缓存；返回副本避免调用方修改污染缓存
+    return dict(_build_db_config(alias))
+
+
+@lru_cache(maxsize=16)
+def _build_db_config(alias: str) -> Dict[str, Any]:
     if alias not in settings.DATABASES:
         raise KeyError(f"Database alias '{alias}' not found in settings.DATABASES")
 
     db_config = settings.DATABASES[alias]
-    engine = db_config.get("ENGINE", "").lower()
-
-    # 解析 vendor
-    if "postgresql" in engine:
-        vendor = "postgresql"
-        default_port = 5432
-    elif "mysql" in engine:
-        vendor = "mysql"
-        default_port = 3306
-    elif "mariadb" in engine:
-        vendor = "mariadb"
-        default_port = 3306
-    elif "sqlite" in engine:
-        vendor = "sqlite"
-        default_port = None  # SQLite 不需要端口
-    else:
-        raise ValueError(f"Unsupported database engine: {engine}")
+    vendor, default_port = _resolve_vendor(db_config.get("ENGINE", ""))
 
     # 提取通用字段
     config = {
@@ -79,8 +110,6 @@ def get_db_config(alias: str = "default") -> Dict[str, Any]:
         if config["database"] == ":memory:":
             raise ValueError("In-memory SQLite databases are not supported for DDL operations.")
         # 确保路径是绝对路径（可选）
-        import os
-        from pathlib import Path
         if not os.path.isabs(config["database"]):
             config["database"] = str(Path(settings.BASE_DIR) / config["database"])
 
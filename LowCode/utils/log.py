@@ -9,15 +9,43 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# 预绑定的结果序列化器（避免每次调用 json.dumps 都重新构造 JSONEncoder）
+_LOG_ENCODE = json.JSONEncoder(default=str, ensure_ascii=False).encode
+
+
+def _encode_result(result):
+    """序列化方法返回值；None / bool / int 直接生成 JSON 文本，无需进入编码器"""
+    if result is None:
+        return "null"
+    result_type = type(result)
+    if result_type is bool:
+        return "true" if result else "false"
+    if result_type is int:
+        return str(result)
+    return _LOG_ENCODE(result)
+
+
 # 默认敏感字段（可扩展）
-DEFAULT_SENSITIVE_KEYS = {'password', 'token', 'secret', 'auth', 'key', 'credential', 'pin', 'ssn'}
+DEFAULT_SENSITIVE_KEYS = frozenset({'password', 'token', 'secret', 'auth', 'key', 'credential', 'pin', 'ssn'})
+
+_CONTAINER_TYPES = (dict, list, tuple)
 
 
 def _sanitize_value(value):
     """递归脱敏数据结构中的敏感字段"""
     if isinstance(value, dict):
+        # 先用一次集合求交判断本层是否存在敏感键
+        sensitive_here = DEFAULT_SENSITIVE_KEYS.intersection(
+            k.lower() for k in value if isinstance(k, str)
+        )
+        if not sensitive_here:
+            # 常见情况：无敏感键，仅对嵌套容器递归
+            return {
+                k: _sanitize_value(v) if isinstance(v, _CONTAINER_TYPES) else v
+                for k, v in value.items()
+            }
         return {
-            k: "[REDACTED]" if k.lower() in DEFAULT_SENSITIVE_KEYS else _sanitize_value(v)
+            k: "[REDACTED]" if isinstance(k, str) and k.lower() in sensitive_here else _sanitize_value(v)
             for k, v in value.items()
         }
     elif isinstance(value, (list, tuple)):
@@ -91,7 +119,7 @@ def record_method_call_log(
                 result = func(self, user, *args, **kwargs)
                 if log_success and include_result:
                     try:
-                        log_data["result_data"] = json.dumps(result, default=str, ensure_ascii=False)
+                        log_data["result_data"] = _encode_result(result)
                     except Exception as je:
                         log_data["result_data"] = f"[SERIALIZE ERROR: {str(je)}]"
                 return result
@@ -132,7 +160,12 @@ def _save_log_sync(log_data):
     """同步保存日志到数据库"""
     try:
         MethodLowCode = apps.get_model('lowcode', 'MethodLowCode')  # ⚠️
-        with transaction.atomic():
+        if transaction.get_connection().in_atomic_block:
+            # 已处于外层事务中：用保存点隔离，日志写入失败不会破坏外层事务
+            with transaction.atomic():
+                MethodLowCode.objects.create(**log_data)
+        else:
+            # 自动提交模式下单条 INSERT 本身即原子，无需额外 BEGIN/COMMIT
             MethodLowCode.objects.create(**log_data)
     except Exception as e:
         logger.error(f"Failed to save method call log synchronously: {e}", exc_info=True)
\ No newline at end of file
@@ -27,8 +27,12 @@
 # quote_identifier 默认使用 "default" 数据库的 quoting 规则（如 PostgreSQL 用双引号，MySQL 用反引号）。
 # 若你在非 default 库中使用不同数据库类型（如 default=PostgreSQL, analytics=MySQL），应直接调用对应 connection 的 quote_name。
 # 此工具仍不适用于 DDL（建表等），因为多数数据库（如 MySQL）会自动提交 DDL，破坏事务原子性。
+import re
 import time
 import logging
+from functools import lru_cache
+from itertools import groupby
+from operator import itemgetter
 from typing import List, Tuple, Any, Optional
 from django.db import connections
 from django.conf import settings
@@ -36,6 +40,9 @@ from django.core.exceptions import ImproperlyConfigured
 
 logger = logging.getLogger(__name__)
 
+# 单调时钟：不受 NTP 校时/系统时间回拨影响，用于超时计算
+_monotonic = time.monotonic
+
 # 默认配置（可被 settings 覆盖）
 DEFAULT_SQL_CONFIG = {
     "timeout": 10.0,
@@ -49,10 +56,245 @@ DEFAULT_SQL_CONFIG = {
 
 SQL_CONFIG = {**DEFAULT_SQL_CONFIG, **getattr(settings, "UNIVERSAL_SQL_TRANSACTION_DEFAULTS", {})}
 
+# 数据库别名 → vendor（连接建立后 vendor 不会变化，避免每次事务都走 connections 查找与属性访问）
+_VENDOR_CACHE = {}
+
+
+def _get_vendor(database: str) -> str:
+    vendor = _VENDOR_CACHE.get(database)
+    if vendor is None:
+        vendor = _VENDOR_CACHE[database] = connections[database].vendor
+    return vendor
+
+
+# 已提示过"未启用持久连接/连接池"的数据库别名（每个别名只告警一次）
+_CONNECT_WARNED = set()
+
+
+def configure_pool(
+    alias: str = "default",
+    min_size: int = 2,
+    max_size: int = 10,
+    timeout: int = 10,
+    max_age: int = 600,
+) -> None:
+    """
+    为指定数据库别名开启连接复用（须在该连接首次使用前调用，如 settings 末尾或 AppConfig.ready）。
+
+    - PostgreSQL + psycopg3：使用 Django ≥ 5.1 内置连接池 OPTIONS["pool"]（与 CONN_MAX_AGE 互斥）
+    - 其他情况：开启持久连接 CONN_MAX_AGE=max_age，并启用 CONN_HEALTH_CHECKS
+
+    :param alias: Django 数据库连接别名
+    :param min_size: 连接池最小连接数
+    :param max_size: 连接池最大连接数
+    :param timeout: 从连接池获取连接的超时时间（秒）
+    :param max_age: 持久连接最大存活时间（秒）
+    """
+    if alias not in settings.DATABASES:
+        raise ImproperlyConfigured(f"Database alias '{alias}' is not configured.")
+    db_settings = settings.DATABASES[alias]
+
+    use_pool = False
+    if db_settings.get("ENGINE") == "django.db.backends.postgresql":
+        try:
+            import psycopg  # noqa: F401
+            use_pool = True
+        except ImportError:
+            pass
+
+    if use_pool:
+        db_settings.setdefault("OPTIONS", {})["pool"] = {
+            "min_size": min_size,
+            "max_size": max_size,
+            "timeout": timeout,
+        }
+        db_settings["CONN_MAX_AGE"] = 0
+    else:
+        db_settings["CONN_MAX_AGE"] = max_age
+    db_settings["CONN_HEALTH_CHECKS"] = True
+
+
+def _warn_if_unpooled(conn, database: str) -> None:
+    """连接尚未建立且未开启持久连接/连接池时告警：每次调用都会重新建连（TCP + 认证握手）"""
+    if database in _CONNECT_WARNED or conn.connection is not None:
+        return
+    _CONNECT_WARNED.add(database)
+    if not conn.settings_dict.get("CONN_MAX_AGE") and not conn.settings_dict.get("OPTIONS", {}).get("pool"):
+        logger.warning(
+            f"Database '{database}' has CONN_MAX_AGE=0 and no connection pool; "
+            f"every transaction opens a new connection. See configure_pool()."
+        )
+
+
+@lru_cache(maxsize=16)
+def _compile_allowed(allowed: tuple) -> "re.Pattern":
+    """将可重试关键词编译为单个忽略大小写的正则，错误信息只需扫描一遍"""
+    return re.compile("|".join(re.escape(kw) for kw in allowed), re.IGNORECASE)
+
+
+# 预编译默认关键词（导入时完成，首次重试判断无需再编译）
+SQL_CONFIG["_allowed_re"] = _compile_allowed(tuple(SQL_CONFIG["allowed_exceptions"]))
+
 
 def _is_retryable_exception(e: Exception, allowed: tuple) -> bool:
-    msg = str(e).lower()
-    return any(kw.lower() in msg for kw in allowed)
+    if not allowed:
+        return False
+    if allowed is SQL_CONFIG["allowed_exceptions"]:
+        pattern = SQL_CONFIG["_allowed_re"]
+    else:
+        pattern = _compile_allowed(tuple(allowed))
+    return pattern.search(str(e)) is not None
+
+
+# merge_statements 预处理可识别的语句形态（仅匹配单表、全部值为 %s 占位符的简单 DML）
+_INSERT_RE = re.compile(
+    r"^\s*INSERT\s+INTO\s+(\S+)\s*\(([^()]*)\)\s*VALUES\s*(\((?:\s*%s\s*,)*\s*%s\s*\))\s*;?\s*$",
+    re.IGNORECASE,
+)
+_UPDATE_RE = re.compile(
+    r"^\s*UPDATE\s+(\S+)\s+SET\s+(.+?)\s+WHERE\s+(\S+)\s*=\s*%s\s*;?\s*$",
+    re.IGNORECASE | re.DOTALL,
+)
+_SET_ITEM_RE = re.compile(r"^\s*(\S+)\s*=\s*%s\s*$")
+_INSERT_PREFIX_RE = re.compile(r"^\s*INSERT\s", re.IGNORECASE)
+_RETURNING_RE = re.compile(r"\sRETURNING\s", re.IGNORECASE)
+_DELETE_RE = re.compile(
+    r"^\s*DELETE\s+FROM\s+(\S+)\s+WHERE\s+(\S+)\s*=\s*%s\s*;?\s*$",
+    re.IGNORECASE,
+)
+
+# 单条合并语句的参数上限（SQLite 旧版本为 999，PostgreSQL 协议上限 65535）
+_MERGE_PARAM_LIMIT = {"sqlite": 999}
+_DEFAULT_MERGE_PARAM_LIMIT = 32767
+
+
+def _chunked(seq: list, size: int):
+    for i in range(0, len(seq), size):
+        yield seq[i:i + size]
+
+
+def _merge_insert(match, params_list: list, limit: int) -> List[Tuple[str, Tuple]]:
+    table, columns, row_tmpl = match.group(1), match.group(2), match.group(3)
+    width = row_tmpl.count("%s")
+    merged = []
+    for chunk in _chunked(params_list, max(1, limit // width)):
+        sql = f"INSERT INTO {table} ({columns}) VALUES " + ", ".join([row_tmpl] * len(chunk))
+        merged.append((sql, tuple(v for params in chunk for v in params)))
+    return merged
+
+
+def _merge_update(match, params_list: list, limit: int) -> Optional[List[Tuple[str, Tuple]]]:
+    table, set_clause, pk = match.group(1), match.group(2), match.group(3)
+    columns = []
+    for item in set_clause.split(","):
+        item_match = _SET_ITEM_RE.match(item)
+        if not item_match:
+            return None
+        columns.append(item_match.group(1))
+    pks = [params[-1] for params in params_list]
+    # CASE 只取第一个匹配分支，同一主键被多次更新时无法保持"后写覆盖"语义
+    if len(set(pks)) != len(pks):
+        return None
+
+    width = 2 * len(columns) + 1
+    merged = []
+    for chunk in _chunked(params_list, max(1, limit // width)):
+        whens = " ".join(["WHEN %s THEN %s"] * len(chunk))
+        assignments = ", ".join(f"{col} = CASE {pk} {whens} END" for col in columns)
+        sql = f"UPDATE {table} SET {assignments} WHERE {pk} IN ({', '.join(['%s'] * len(chunk))})"
+        values = []
+        for idx in range(len(columns)):
+            for params in chunk:
+                values.extend((params[-1], params[idx]))
+        values.extend(params[-1] for params in chunk)
+        merged.append((sql, tuple(values)))
+    return merged
+
+
+def _merge_delete(match, params_list: list, limit: int) -> List[Tuple[str, Tuple]]:
+    table, pk = match.group(1), match.group(2)
+    merged = []
+    for chunk in _chunked(params_list, limit):
+        sql = f"DELETE FROM {table} WHERE {pk} IN ({', '.join(['%s'] * len(chunk))})"
+        merged.append((sql, tuple(params[0] for params in chunk)))
+    return merged
+
+
+def _merge_operations(
+    operations: List[Tuple[str, Tuple]],
+    db_vendor: str,
+    keep_last: bool = False,
+) -> List[Tuple[str, Tuple]]:
+    """
+    将连续、同形态的 INSERT/UPDATE/DELETE 合并为单条语句：
+      - N 条 INSERT → INSERT ... VALUES (...), (...)
+      - N 条 UPDATE ... WHERE pk = %s → UPDATE ... SET col = CASE pk WHEN ... END WHERE pk IN (...)
+      - N 条 DELETE ... WHERE pk = %s → DELETE ... WHERE pk IN (...)
+    无法识别的语句原样保留。keep_last=True 时不合并最后一组（保证 last_insert_id 语义不变）。
+    """
+    limit = _MERGE_PARAM_LIMIT.get(db_vendor, _DEFAULT_MERGE_PARAM_LIMIT)
+    groups = [(sql, [params for _, params in group]) for sql, group in groupby(operations, key=itemgetter(0))]
+    merged = []
+    for index, (sql, params_list) in enumerate(groups):
+        result = None
+        if len(params_list) > 1 and not (keep_last and index == len(groups) - 1) \
+                and all(isinstance(params, (tuple, list)) for params in params_list):
+            if match := _INSERT_RE.match(sql):
+                result = _merge_insert(match, params_list, limit)
+            elif match := _UPDATE_RE.match(sql):
+                result = _merge_update(match, params_list, limit)
+            elif match := _DELETE_RE.match(sql):
+                result = _merge_delete(match, params_list, limit)
+        if result is None:
+            merged.extend((sql, params) for params in params_list)
+        else:
+            merged.extend(result)
+    return merged
+
+
+def _execute_operations(cursor, operations: List[Tuple[str, Tuple]]) -> None:
+    """
+    执行操作列表：连续且 SQL 模板相同的操作合并为一次 executemany
+    （psycopg3 走 pipeline、PyMySQL/mysqlclient 将 INSERT 改写为多行 VALUES，显著减少往返次数）
+    """
+    for sql, group in groupby(operations, key=itemgetter(0)):
+        params_list = [params for _, params in group]
+        for params in params_list:
+            if not isinstance(params, (tuple, list)):
+                raise ValueError("SQL parameters must be a tuple or list.")
+        if len(params_list) == 1:
+            cursor.execute(sql, params_list[0])
+        else:
+            cursor.executemany(sql, params_list)
+
+
+def _execute_last_with_id(cursor, conn, db_vendor: str, sql: str, params, pk_name: Optional[str] = None):
+    """
+    执行最后一条操作并在同一次往返内取回新插入行的主键：
+      - MySQL / SQLite：驱动在 execute 后即填充 cursor.lastrowid
+      - PostgreSQL：已自带 RETURNING 则直接读取；调用方显式给出 pk_name 时为 INSERT 追加 RETURNING
+    其他情况回退为额外的 LASTVAL() 查询。
+    """
+    if not isinstance(params, (tuple, list)):
+        raise ValueError("SQL parameters must be a tuple or list.")
+
+    if db_vendor in ('mysql', 'sqlite'):
+        cursor.execute(sql, params)
+        return cursor.lastrowid
+
+    if db_vendor == 'postgresql':
+        has_returning = _RETURNING_RE.search(sql) is not None
+        if has_returning or (pk_name and _INSERT_PREFIX_RE.match(sql)):
+            if not has_returning:
+                sql = f"{sql.rstrip().rstrip(';')} RETURNING {conn.ops.quote_name(pk_name)}"
+            cursor.execute(sql, params)
+        else:
+            cursor.execute(sql, params)
+            cursor.execute("SELECT LASTVAL();")
+        result = cursor.fetchone()
+        return result[0] if result else None
+
+    raise NotImplementedError(f"Unsupported database vendor: {db_vendor}")
 
 
 def execute_sql_transaction(
@@ -63,7 +305,9 @@ def execute_sql_transaction(
     retry_times: Optional[int] = None,
     retry_delay: Optional[float] = None,
     allowed_exceptions: Optional[tuple] = None,
-    database: str = "default"
+    database: str = "default",
+    merge_statements: bool = False,
+    pk_name: Optional[str] = None
 ):
     """
     在单个事务中执行一系列参数化 SQL 操作（仅 DML），支持重试、超时与 last_insert_id 获取。
@@ -77,6 +321,9 @@ def execute_sql_transaction(
     :param retry_delay: 初始重试延迟（秒，指数退避）
     :param allowed_exceptions: 可重试的异常关键词列表
     :param database: Django 数据库连接别名（如 'default', 'analytics'）
+    :param merge_statements: 是否将连续同形态的 INSERT/UPDATE/DELETE 合并为单条多值语句执行
+    :param pk_name: PostgreSQL 下为最后一条 INSERT 追加 RETURNING 时使用的主键列名；
+                    None（默认）时沿用 LASTVAL() 查询
     :return: 如果 fetch_last_id=True，返回 last_id；否则返回 None
     :raises: TimeoutError, DatabaseError, 或原始异常
     """
@@ -93,35 +340,28 @@ def execute_sql_transaction(
     actual_retry_delay = retry_delay if retry_delay is not None else SQL_CONFIG["retry_delay"]
     actual_allowed = allowed_exceptions if allowed_exceptions is not None else SQL_CONFIG["allowed_exceptions"]
 
+    if merge_statements:
+        operations = _merge_operations(operations, _get_vendor(database), keep_last=fetch_last_id)
+
     last_exception = None
-    start_time = time.time()
+    start_time = _monotonic()
 
     for attempt in range(actual_retry_times + 1):
         try:
             conn = connections[database]
+            _warn_if_unpooled(conn, database)
             with conn.cursor() as cursor:
-                inner_start = time.time()
-                for sql, params in operations:
-                    if not isinstance(params, (tuple, list)):
-                        raise ValueError("SQL parameters must be a tuple or list.")
-                    cursor.execute(sql, params)
-
+                inner_start = _monotonic()
                 last_id = None
                 if fetch_last_id:
-                    db_vendor = conn.vendor
-                    if db_vendor == 'postgresql':
-                        cursor.execute("SELECT LASTVAL();")
-                    elif db_vendor == 'mysql':
-                        cursor.execute("SELECT LAST_INSERT_ID();")
-                    elif db_vendor == 'sqlite':
-                        cursor.execute("SELECT last_insert_rowid();")
-                    else:
-                        raise NotImplementedError(f"Unsupported database vendor: {db_vendor}")
-                    result = cursor.fetchone()
-                    last_id = result[0] if result else None
-
-                duration = time.time() - inner_start
-                total_elapsed = time.time() - start_time
+                    _execute_operations(cursor, operations[:-1])
+                    last_sql, last_params = operations[-1]
+                    last_id = _execute_last_with_id(cursor, conn, _get_vendor(database), last_sql, last_params, pk_name)
+                else:
+                    _execute_operations(cursor, operations)
+
+                duration = _monotonic() - inner_start
+                total_elapsed = _monotonic() - start_time
                 if total_elapsed > actual_timeout:
                     raise TimeoutError(f"SQL transaction total time exceeded {actual_timeout}s")
 
@@ -136,7 +376,7 @@ def execute_sql_transaction(
 
         except Exception as e:
             last_exception = e
-            total_elapsed = time.time() - start_time
+            total_elapsed = _monotonic() - start_time
             if total_elapsed > actual_timeout:
                 logger.warning("❌ Aborting retries due to total timeout.")
                 break
@@ -151,7 +391,7 @@ def execute_sql_transaction(
             else:
                 break
 
-    total_duration = time.time() - start_time
+    total_duration = _monotonic() - start_time
     logger.error(
         f"❌ SQL transaction failed after {actual_retry_times + 1} attempts | "
         f"DB: {database} | Ops: {len(operations)} | "
@@ -169,5 +409,10 @@ def quote_identifier(name: str) -> str:
     """
     if not isinstance(name, str):
         raise TypeError("Identifier name must be a string.")
+    return _quote_default(name)
+
+
+@lru_cache(maxsize=4096)
+def _quote_default(name: str) -> str:
     # 使用 default 连接的 quoting 规则（大多数情况下足够）
     return connections["default"].ops.quote_name(name)
\ No newline at end of file
@@ -21,6 +21,11 @@ import json
 import hashlib
 from typing import Any, Dict, Optional, Union, List
 
+try:
+    import orjson
+except ImportError:  # 可选依赖，缺失时回退到标准库 json
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
 # 默认主键候选字段（大小写不敏感）
@@ -32,50 +37,71 @@ DEFAULT_INDEX_CANDIDATES = {
     "created_at", "updated_at", "deleted_at", "category"
 }
 
+# 统一小写后的候选集合（模块加载时构建一次）
+_PK_CANDS = frozenset(name.lower() for name in DEFAULT_PRIMARY_KEY_CANDIDATES)
+_INDEX_CANDS = frozenset(name.lower() for name in DEFAULT_INDEX_CANDIDATES)
+
+
+_json_loads = orjson.loads if orjson is not None else json.loads
+
+# 合法 JSON 对象/数组的首尾字符配对
+_JSON_BRACKETS = {"{": "}", "[": "]"}
+
 
 def _is_valid_json_str(s: str) -> bool:
-    """判断字符串是否为有效 JSON"""
+    """判断字符串是否为有效 JSON 对象/数组（先做首尾字符预筛，绝大多数普通文本无需进入解析器）"""
+    s = s.strip()
+    if len(s) < 2 or _JSON_BRACKETS.get(s[0]) != s[-1]:
+        return False
     try:
-        json.loads(s)
+        _json_loads(s)
         return True
     except (ValueError, TypeError):
         return False
 
 
-def _infer_column_type_postgresql(value: Any) -> str:
-    if isinstance(value, bool):
-        return "BOOLEAN"
-    elif isinstance(value, int):
-        return "BIGINT"
-    elif isinstance(value, float):
-        return "DOUBLE PRECISION"
-    elif isinstance(value, str):
-        if value.startswith(("{", "[")) and _is_valid_json_str(value):
-            return "JSONB"
-        else:
-            return "TEXT"
+# Python 类型 → 列类型（按 type(value) 精确查表；None 表示需进一步判断是否为 JSON 字符串）
+_PG_TYPES = {bool: "BOOLEAN", int: "BIGINT", float: "DOUBLE PRECISION", str: None}
+_MY_TYPES = {bool: "TINYINT(1)", int: "BIGINT", float: "DOUBLE", str: None}
+
+
+def _lookup_column_type(type_map: Dict[type, Optional[str]], value: Any, json_type: str) -> str:
+    value_type = type(value)
+    if value_type in type_map:
+        col_type = type_map[value_type]
     else:
-        return "TEXT"
+        # 子类（如 IntEnum、str 子类）回退到 isinstance 判断，按表中顺序（bool 先于 int）
+        col_type = "TEXT"
+        for base, base_type in type_map.items():
+            if isinstance(value, base):
+                col_type = base_type
+                break
+    if col_type is not None:
+        return col_type
+    return json_type if value[:1] in "{[" and _is_valid_json_str(value) else "TEXT"
+
+
+def _infer_column_type_postgresql(value: Any) -> str:
+    return _lookup_column_type(_PG_TYPES, value, "JSONB")
 
 
 def _infer_column_type_mysql(value: Any) -> str:
-    if isinstance(value, bool):
-        return "TINYINT(1)"
-    elif isinstance(value, int):
-        return "BIGINT"
-    elif isinstance(value, float):
-        return "DOUBLE"
-    elif isinstance(value, str):
-        if value.startswith(("{", "[")) and _is_valid_json_str(value):
-            return "JSON"
-        else:
-            return "TEXT"
-    else:
-        return "TEXT"
+    return _lookup_column_type(_MY_TYPES, value, "JSON")
 
 
 def _get_db_engine(conn) -> str:
-    """从连接对象推断数据库类型"""
+    """从连接对象推断数据库类型（结果缓存在连接对象上）"""
+    engine = getattr(conn, "_cached_engine", None)
+    if engine is None:
+        engine = _resolve_db_engine(conn)
+        try:
+            conn._cached_engine = engine
+        except (AttributeError, TypeError):
+            pass  # 部分 C 扩展连接对象不允许设置属性
+    return engine
+
+
+def _resolve_db_engine(conn) -> str:
     # 尝试 Django 风格的 vendor 属性
     if hasattr(conn, 'vendor'):
         vendor = getattr(conn, 'vendor', '').lower()
@@ -94,12 +120,16 @@ def _get_db_engine(conn) -> str:
         raise ValueError(f"Unsupported database connection type: {type(conn)}")
 
 
+# 各引擎的标识符引用格式（预绑定 str.format，避免逐列分支判断）
+_QUOTE_FORMATTERS = {
+    "postgresql": '"{}"'.format,
+    "mysql": "`{}`".format,
+}
+
+
 def _quote_identifier(engine: str, name: str) -> str:
     """安全转义标识符（防 SQL 注入）"""
-    if engine == "postgresql":
-        return f'"{name}"'
-    else:  # mysql
-        return f"`{name}`"
+    return _QUOTE_FORMATTERS[engine](name)
 
 
 def _build_column_definitions(
@@ -108,23 +138,23 @@ def _build_column_definitions(
     infer_func
 ) -> Dict[str, str]:
     """构建列定义字典：{col_name: "quoted_name TYPE"}"""
+    quote = _QUOTE_FORMATTERS[engine]
     col_defs = {}
     for key, value in sample_data.items():
         if not isinstance(key, str) or not key.strip():
             raise ValueError(f"Invalid column name: {repr(key)}")
         col_name = key.strip()
-        col_type = infer_func(value)
-        quoted_name = _quote_identifier(engine, col_name)
-        col_defs[col_name] = f"{quoted_name} {col_type}"
+        col_defs[col_name] = f"{quote(col_name)} {infer_func(value)}"
     return col_defs
 
 
 def _detect_primary_key(
     table_name: str,
     columns: List[str],
-    explicit_pk: Optional[Union[str, List[str]]] = None
+    explicit_pk: Optional[Union[str, List[str]]] = None,
+    lowered: Optional[List[str]] = None
 ) -> Optional[List[str]]:
-    """确定主键字段列表"""
+    """确定主键字段列表（lowered 为与 columns 一一对应的小写列名，可复用以免重复 lower()）"""
     if explicit_pk is not None:
         pk_list = [explicit_pk] if isinstance(explicit_pk, str) else list(explicit_pk)
         missing = set(pk_list) - set(columns)
@@ -134,9 +164,11 @@ def _detect_primary_key(
 
     # 自动检测
     table_id = f"{table_name.rstrip('_')}_id".lower()
-    candidates = [col for col in columns if col.lower() in DEFAULT_PRIMARY_KEY_CANDIDATES]
-    if candidates:
-        return [candidates[0]]
+    if lowered is None:
+        lowered = [col.lower() for col in columns]
+    for col, low in zip(columns, lowered):
+        if low in _PK_CANDS:
+            return [col]
     if table_id in columns:
         return [table_id]
     return None
@@ -144,9 +176,10 @@ def _detect_primary_key(
 
 def _detect_indexes(
     columns: List[str],
-    explicit_indexes: Optional[List[Union[str, List[str]]]] = None
+    explicit_indexes: Optional[List[Union[str, List[str]]]] = None,
+    lowered: Optional[List[str]] = None
 ) -> List[List[str]]:
-    """合并显式与默认索引"""
+    """合并显式与默认索引（lowered 含义同 _detect_primary_key）"""
     index_list: List[List[str]] = []
 
     # 显式索引
@@ -159,9 +192,11 @@ def _detect_indexes(
             index_list.append(idx_cols)
 
     # 默认单列索引（避免重复）
-    existing_singles = {tuple(i) for i in index_list if len(i) == 1}
-    for col in columns:
-        if col.lower() in DEFAULT_INDEX_CANDIDATES and (col,) not in existing_singles:
+    existing_singles = {i[0] for i in index_list if len(i) == 1}
+    if lowered is None:
+        lowered = [col.lower() for col in columns]
+    for col, low in zip(columns, lowered):
+        if low in _INDEX_CANDS and col not in existing_singles:
             index_list.append([col])
 
     return index_list
@@ -187,18 +222,16 @@ def _create_table_with_constraints(
     indexes: Optional[List[List[str]]] = None
 ) -> bool:
     """执行建表及索引创建（不提交事务）"""
-    quoted_table = _quote_identifier(engine, table_name)
+    quote = _QUOTE_FORMATTERS[engine]
+    quoted_table = quote(table_name)
     column_clauses = list(col_defs.values())
 
     # 添加主键约束
     if primary_key:
-        pk_quoted = ", ".join(_quote_identifier(engine, col) for col in primary_key)
+        pk_quoted = ", ".join([quote(col) for col in primary_key])
         column_clauses.append(f"PRIMARY KEY ({pk_quoted})")
 
-    create_sql = f"CREATE TABLE IF NOT EXISTS {quoted_table} ({', '.join(column_clauses)});"
-
-    with conn.cursor() as cur:
-        cur.execute(create_sql)
+    statements = [f"CREATE TABLE IF NOT EXISTS {quoted_table} ({', '.join(column_clauses)});"]
 
     # 创建额外索引
     if indexes:
@@ -206,13 +239,20 @@ def _create_table_with_constraints(
             if primary_key and set(idx_cols) == set(primary_key):
                 continue  # 主键已有索引
             idx_name = _generate_safe_index_name(table_name, idx_cols)
-            idx_quoted_cols = ", ".join(_quote_identifier(engine, col) for col in idx_cols)
-            idx_sql = (
-                f"CREATE INDEX IF NOT EXISTS {_quote_identifier(engine, idx_name)} "
+            idx_quoted_cols = ", ".join([quote(col) for col in idx_cols])
+            statements.append(
+                f"CREATE INDEX IF NOT EXISTS {quote(idx_name)} "
                 f"ON {quoted_table} ({idx_quoted_cols});"
             )
-            with conn.cursor() as cur:
-                cur.execute(idx_sql)
+
+    with conn.cursor() as cur:
+        if engine == "postgresql":
+            # psycopg2 / psycopg3 无参数时支持一次提交多条语句，建表与建索引合并为一次往返
+            cur.execute("\n".join(statements))
+        else:
+            # MySQL 默认未开启 CLIENT.MULTI_STATEMENTS，复用同一游标逐条执行
+            for stmt in statements:
+                cur.execute(stmt)
 
     logger.info(f"[DDL] Ensured table exists: '{table_name}' on {engine.upper()}")
     return True
@@ -256,8 +296,9 @@ def ensure_table_exists(
     col_defs = _build_column_definitions(engine, sample_data, infer_func)
     columns = list(col_defs.keys())
 
-    pk = _detect_primary_key(table_name, columns, primary_key)
-    idx_list = _detect_indexes(columns, indexes)
+    lowered = [col.lower() for col in columns]
+    pk = _detect_primary_key(table_name, columns, primary_key, lowered)
+    idx_list = _detect_indexes(columns, indexes, lowered)
 
     return _create_table_with_constraints(
         conn=conn,
@@ -9,22 +9,36 @@
 # 场景	推荐函数
 # 低代码 Web 平台	generate_unique_id, sanitize_input, require_env
 # 机器学习实验	split_dataframe, compute_metrics, save_model_artifact
-# 网络爬虫	safe_request, extract_text_from_html, save_crawl_results
+# 网络爬虫	safe_request, safe_request_many, extract_text_from_html, save_crawl_results
 # 通用开发	setup_logger, ensure_dir, read_json/write_json
 import os
 import json
+import time
 import uuid
 import random
 import logging
 import datetime
+import http.cookiejar
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Union, Callable
 from functools import wraps
 
 import numpy as np
 import pandas as pd
-from bs4 import BeautifulSoup
+
+try:
+    import orjson
+except ImportError:  # 可选依赖，缺失时回退到标准库 json
+    orjson = None
+
+try:
+    from selectolax.parser import HTMLParser
+except ImportError:  # 可选依赖，缺失时回退到 BeautifulSoup（纯 Python html.parser，较慢）
+    HTMLParser = None
+    from bs4 import BeautifulSoup
 
 # ======================
 # 通用配置与常量
@@ -40,6 +54,15 @@ USER_AGENTS = [
 DEFAULT_RETRY_TIMES = 3
 DEFAULT_TIMEOUT = 10
 
+# 模块级共享会话：复用 TCP/TLS 连接（Keep-Alive），避免每次请求重新握手与 DNS 解析
+# 重试由 safe_request 自行控制，适配器层不重试
+_HTTP_SESSION = requests.Session()
+# 只共享连接池、不保存 Cookie：与原先每次 requests.request 使用全新 Cookie 罐一致，避免调用方之间互相带上对方的会话
+_HTTP_SESSION.cookies.set_policy(http.cookiejar.DefaultCookiePolicy(allowed_domains=[]))
+_HTTP_ADAPTER = HTTPAdapter(pool_connections=32, pool_maxsize=64, max_retries=Retry(total=0))
+_HTTP_SESSION.mount("http://", _HTTP_ADAPTER)
+_HTTP_SESSION.mount("https://", _HTTP_ADAPTER)
+
 
 # ======================
 # 日志 & 路径
@@ -92,6 +115,8 @@ def validate_email(email: str) -> bool:
 def sanitize_input(user_input: str) -> str:
     """对用户输入进行基础清洗（防 XSS 等）"""
     # 移除 HTML 标签（保留文本）
+    if HTMLParser is not None:
+        return HTMLParser(user_input).text()
     soup = BeautifulSoup(user_input, "html.parser")
     return soup.get_text()
 
@@ -108,33 +133,53 @@ def require_env(var_name: str) -> str:
 # 机器学习工具
 # ======================
 
-def save_model_artifact(data: Any, path: Union[str, Path]) -> None:
-    """保存模型或预处理对象（支持 pickle / joblib 扩展）"""
+def save_model_artifact(data: Any, path: Union[str, Path], compress: Any = ("lz4", 1)) -> None:
+    """
+    保存模型或预处理对象（支持 pickle / joblib 扩展）
+
+    默认使用 lz4 轻量压缩（写入字节约减半，解压 >1 GB/s），未安装 lz4 时回退为不压缩；
+    若需在加载时以 mmap 方式读取大数组，请传 compress=0。
+    """
     import joblib
-    joblib.dump(data, path)
+    if isinstance(compress, tuple) and compress[0] == "lz4":
+        try:
+            import lz4  # noqa: F401
+        except ImportError:
+            compress = 0
+    joblib.dump(data, path, compress=compress)
 
 
-def load_model_artifact(path: Union[str, Path]) -> Any:
-    """加载模型或预处理对象"""
+def load_model_artifact(path: Union[str, Path], mmap_mode: Optional[str] = None) -> Any:
+    """
+    加载模型或预处理对象
+
+    mmap_mode='r' 时大数组按需内存映射而非一次性读入内存（仅对未压缩文件生效，返回的数组只读）。
+    """
     import joblib
-    return joblib.load(path)
+    return joblib.load(path, mmap_mode=mmap_mode)
 
 
 def split_dataframe(df: pd.DataFrame, train_ratio: float = 0.8, random_state: int = 42) -> tuple:
-    """按比例分割 DataFrame（训练集/测试集）"""
-    df = df.sample(frac=1, random_state=random_state).reset_index(drop=True)
+    """
+    按比例分割 DataFrame（训练集/测试集）
+
+    只对行号做一次随机置换再按位置 take，不生成整表打乱后的中间副本；
+    返回的两个 DataFrame 保留原索引标签。
+    """
+    perm = np.random.default_rng(random_state).permutation(len(df))
     n_train = int(len(df) * train_ratio)
-    return df.iloc[:n_train], df.iloc[n_train:]
+    return df.take(perm[:n_train]), df.take(perm[n_train:])
 
 
 def compute_metrics(y_true: np.ndarray, y_pred: np.ndarray) -> Dict[str, float]:
     """计算常见分类指标（准确率、精确率、召回率、F1）"""
-    from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score
+    from sklearn.metrics import accuracy_score, precision_recall_fscore_support
     try:
         acc = accuracy_score(y_true, y_pred)
-        prec = precision_score(y_true, y_pred, average='weighted', zero_division=0)
-        rec = recall_score(y_true, y_pred, average='weighted', zero_division=0)
-        f1 = f1_score(y_true, y_pred, average='weighted', zero_division=0)
+        # 一次统计同时得到 precision / recall / F1（避免分别调用时重复构建混淆矩阵）
+        prec, rec, f1, _ = precision_recall_fscore_support(
+            y_true, y_pred, average='weighted', zero_division=0
+        )
         return {"accuracy": acc, "precision": prec, "recall": rec, "f1": f1}
     except Exception as e:
         return {"error": str(e)}
@@ -161,7 +206,7 @@ def safe_request(
 
     for attempt in range(retries + 1):
         try:
-            resp = requests.request(method, url, headers=headers, timeout=timeout, **kwargs)
+            resp = _HTTP_SESSION.request(method, url, headers=headers, timeout=timeout, **kwargs)
             resp.raise_for_status()
             return resp
         except Exception as e:
@@ -172,8 +217,65 @@ def safe_request(
     return None
 
 
+async def _safe_request_async(client, url: str, method: str, retries: int, timeout: int, **kwargs):
+    """safe_request 的协程版本（单个 URL），失败返回 None"""
+    headers = dict(kwargs.pop("headers", {}))
+    headers.setdefault("User-Agent", get_random_user_agent())
+
+    for attempt in range(retries + 1):
+        try:
+            resp = await client.request(method, url, headers=headers, timeout=timeout, **kwargs)
+            resp.raise_for_status()
+            return resp
+        except Exception as e:
+            if attempt == retries:
+                logging.warning(f"Failed to fetch {url} after {retries + 1} attempts: {e}")
+                return None
+            logging.debug(f"Retry {attempt + 1}/{retries + 1} for {url}")
+    return None
+
+
+async def safe_request_many(
+        urls: List[str],
+        method: str = "GET",
+        retries: int = DEFAULT_RETRY_TIMES,
+        timeout: int = DEFAULT_TIMEOUT,
+        concurrency: int = 20,
+        **kwargs
+) -> list:
+    """
+    并发抓取多个 URL（asyncio + httpx），单线程内重叠网络等待，总耗时接近最慢的单个请求。
+    返回与 urls 顺序一致的列表，元素为 httpx.Response 或 None（失败）。
+    安装了 h2 时自动启用 HTTP/2 多路复用。
+    """
+    import asyncio
+    import httpx
+
+    try:
+        import h2  # noqa: F401
+        http2 = True
+    except ImportError:
+        http2 = False
+
+    sem = asyncio.Semaphore(concurrency)
+    limits = httpx.Limits(max_connections=concurrency * 2)
+
+    async with httpx.AsyncClient(http2=http2, limits=limits) as client:
+        async def bound(url: str):
+            async with sem:
+                return await _safe_request_async(client, url, method, retries, timeout, **kwargs)
+
+        return await asyncio.gather(*(bound(url) for url in urls))
+
+
 def extract_text_from_html(html: str) -> str:
     """从 HTML 中提取纯文本"""
+    if HTMLParser is not None:
+        tree = HTMLParser(html)
+        for node in tree.css("script, style"):
+            node.decompose()
+        # 以 \x00 分隔各文本节点，再丢弃空白节点，与 BeautifulSoup.stripped_strings 的结果一致
+        return " ".join(filter(None, tree.text(separator="\x00", strip=True).split("\x00")))
     soup = BeautifulSoup(html, "html.parser")
     for script in soup(["script", "style"]):
         script.decompose()
@@ -186,8 +288,8 @@ def save_crawl_results(data: List[Dict], output_path: Union[str, Path], format:
     ensure_dir(output_path.parent)
 
     if format == "json":
-        with open(output_path, "w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        with open(output_path, "wb") as f:
+            f.write(_dumps_json_bytes(data, indent=2))
     elif format == "csv":
         pd.DataFrame(data).to_csv(output_path, index=False, encoding="utf-8-sig")
     else:
@@ -231,9 +333,23 @@ def read_json(file_path: Union[str, Path]) -> Dict:
         return json.load(f)
 
 
+def _dumps_json_bytes(data: Any, indent: Optional[int] = 2) -> bytes:
+    """
+    序列化为 UTF-8 JSON 字节串（不转义非 ASCII）。
+    orjson 可用且缩进为 2/None 时走 C 编码器一次性生成，否则（或遇到 orjson 不支持的值，如超 64 位整数）回退标准库 json。
+    """
+    if orjson is not None and indent in (2, None):
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+        try:
+            return orjson.dumps(data, option=option)
+        except TypeError:
+            pass
+    return json.dumps(data, ensure_ascii=False, indent=indent).encode("utf-8")
+
+
 def write_json(data: Dict, file_path: Union[str, Path], indent: int = 2) -> None:
-    with open(file_path, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=indent)
+    with open(file_path, "wb") as f:
+        f.write(_dumps_json_bytes(data, indent=indent))
 
 
 # ======================
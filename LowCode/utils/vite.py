@@ -1,9 +1,49 @@
 # lowcode/utils/vite.py
+import functools
 import json
 import os
 from django.conf import settings
 from django.core.exceptions import ImproperlyConfigured
+from django.core.signals import setting_changed
 from django.contrib.staticfiles import finders
+from django.dispatch import receiver
+
+try:
+    import orjson
+except ImportError:  # 可选依赖，缺失时回退到标准库 json
+    orjson = None
+
+_json_loads = orjson.loads if orjson is not None else json.loads
+
+
+@functools.lru_cache(maxsize=8)
+def _load_manifest(manifest_path: str) -> dict:
+    """
+    查找并解析 manifest.json（按路径缓存，进程内只读盘、解析一次）。
+
+    查找失败或解析失败时抛出异常，异常结果不会被缓存。
+    """
+    full_path = finders.find(manifest_path)
+    if not full_path or not os.path.isfile(full_path):
+        raise ImproperlyConfigured(
+            f"Vite manifest 文件未找到: '{manifest_path}'。\n"
+            "请确认已执行 `npm run build` 并运行 `python manage.py collectstatic`。"
+        )
+
+    try:
+        with open(full_path, 'rb') as f:
+            return _json_loads(f.read())
+    except (OSError, ValueError) as e:
+        raise ImproperlyConfigured(
+            f"无法读取或解析 Vite manifest 文件 '{full_path}': {e}"
+        )
+
+
+@receiver(setting_changed)
+def _clear_manifest_cache(*, setting, **kwargs):
+    """静态文件相关配置变更时（如测试中 override_settings）清空 manifest 缓存"""
+    if setting in ("DEBUG", "STATIC_ROOT", "STATICFILES_DIRS", "VITE_MANIFEST_RELOAD"):
+        _load_manifest.cache_clear()
 
 
 def get_vite_manifest(
@@ -15,7 +55,7 @@ def get_vite_manifest(
     获取 Vite 构建生成的 manifest.json 内容。
 
     - 开发环境（settings.DEBUG=True）：直接返回 dev_fallback（不读磁盘）
-    - 生产环境：通过 staticfiles 查找 manifest.json
+    - 生产环境：通过 staticfiles 查找 manifest.json（进程内缓存，仅首次读盘）
 
     Args:
         app_name: 应用名称，用于构造默认 manifest 路径
@@ -43,20 +83,10 @@ def get_vite_manifest(
         # 注意：Vite 默认输出到 .vite/manifest.json（相对于 outDir）
         manifest_path = os.path.join(app_name, ".vite", "manifest.json")
 
-    full_path = finders.find(manifest_path)
-    if not full_path or not os.path.isfile(full_path):
-        raise ImproperlyConfigured(
-            f"Vite manifest 文件未找到: '{manifest_path}'。\n"
-            "请确认已执行 `npm run build` 并运行 `python manage.py collectstatic`。"
-        )
-
-    try:
-        with open(full_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except (OSError, ValueError, json.JSONDecodeError) as e:
-        raise ImproperlyConfigured(
-            f"无法读取或解析 Vite manifest 文件 '{full_path}': {e}"
-        )
+    # VITE_MANIFEST_RELOAD=True 时每次重新读取（便于本地调试生产构建）
+    if getattr(settings, 'VITE_MANIFEST_RELOAD', False):
+        _load_manifest.cache_clear()
+    return _load_manifest(manifest_path)
 
 
 def get_vite_asset(
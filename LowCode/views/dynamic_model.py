@@ -1,9 +1,11 @@
 # lowcode/views/dynamic_model.py
 # 动态模型相关代码（CRUD 视图、模型创建 / 列表 / 升级、动态方法调用、VUE 交互 API）
+import functools
 import logging
 import re
 import json
-from typing import Any, Dict, List, Type, Optional
+import time
+from typing import Any, Dict, List, Set, Type, Optional
 from datetime import datetime, date
 from uuid import uuid4
 
@@ -15,7 +17,9 @@ from django.core.cache import cache
 from django.core.exceptions import PermissionDenied, ValidationError
 from django.http import Http404, HttpRequest, JsonResponse, HttpResponse
 from django.db import connection, models, transaction
-from django.db.models import Q
+from django.db.models.signals import class_prepared, post_delete, post_migrate, post_save
+from django.dispatch import receiver
+from django.db.models import Count, Q
 from django.shortcuts import render, get_object_or_404, redirect, reverse
 from django.utils import timezone
 from django.utils.text import capfirst
@@ -52,6 +56,9 @@ from django.db import ProgrammingError
 
 # 配置
 CACHE_TIMEOUT = 60
+EXISTING_TABLES_CACHE_KEY = 'lowcode_existing_tables'
+EXISTING_TABLES_CACHE_TIMEOUT = 30
+CACHE_VERSION_KEY = 'lowcode_cache_ver'
 logger = logging.getLogger(__name__)
 
 ModelConfigType = Dict[str, Any]
@@ -59,65 +66,45 @@ OverviewDataType = Dict[str, Any]
 
 
 # ========== 通用缓存清理工具函数 ==========
+def _cache_ver() -> int:
+    """模型统计缓存（记录数/字段数）的全局版本号，版本号是缓存键的一部分"""
+    return cache.get_or_set(CACHE_VERSION_KEY, lambda: int(time.time()), None)
+
+
+def _bump_cache_ver():
+    """递增版本号使全部模型统计缓存失效（O(1)，替代按前缀 SCAN 的 delete_pattern）"""
+    try:
+        cache.incr(CACHE_VERSION_KEY)
+    except ValueError:
+        # 版本号已被淘汰：以当前时间戳重建，避免与仍存活的旧版本键重名
+        cache.set(CACHE_VERSION_KEY, int(time.time()), None)
+
+
+def _data_count_key(model_name: str, ver: int) -> str:
+    return f'lowcode_data_count_{ver}_{model_name}'
+
+
+def _field_count_key(model_name: str, ver: int) -> str:
+    return f'lowcode_field_count_{ver}_{model_name}'
+
+
 def safe_clear_model_cache(model_name: str = None):
     """
     安全清理模型相关缓存（兼容所有缓存后端）
+    指定模型时精确删除该模型的缓存键；不指定时递增缓存版本号，不做按前缀的键空间扫描
     :param model_name: 模型名称（None 表示清理所有模型缓存）
     """
     try:
-        # 1. 定义需要清理的缓存键列表
-        cache_keys = []
         if model_name:
-            # 清理指定模型的缓存
-            cache_keys.extend([
-                f'lowcode_field_count_{model_name}',
-                f'lowcode_data_count_{model_name}',
+            ver = _cache_ver()
+            cache.delete_many([
+                _field_count_key(model_name, ver),
+                _data_count_key(model_name, ver),
                 f'dynamic_model_{model_name}',
             ])
         else:
-            # 清理所有模型相关缓存（谨慎使用）
-            cache_keys.extend([
-                'dynamic_model_list',
-                'dynamic_model_tables',
-            ])
-
-        # 2. 批量删除明确的缓存键（所有后端都支持）
-        if cache_keys:
-            cache.delete_many(cache_keys)
-
-        # 3. 尝试模式匹配删除（仅对支持的后端生效）
-        if model_name:
-            patterns = [
-                f'lowcode_field_count_{model_name}*',
-                f'lowcode_data_count_{model_name}*',
-                f'dynamic_model_{model_name}*',
-            ]
-        else:
-            patterns = [
-                'lowcode_field_count_*',
-                'lowcode_data_count_*',
-                'dynamic_model_*',
-            ]
-
-        # 检查缓存后端是否支持 delete_pattern
-        if hasattr(cache, 'delete_pattern'):
-            for pattern in patterns:
-                cache.delete_pattern(pattern)
-        else:
-            # 对 LocMemCache 尝试安全的 keys 遍历（仅当 keys 方法存在时）
-            if hasattr(cache, 'keys'):
-                try:
-                    all_keys = cache.keys('*')
-                    match_keys = []
-                    for pattern in patterns:
-                        # 简单的通配符匹配（仅处理 * 结尾）
-                        prefix = pattern.rstrip('*')
-                        match_keys.extend([k for k in all_keys if k.startswith(prefix)])
-                    if match_keys:
-                        cache.delete_many(match_keys)
-                except Exception:
-                    # LocMemCache 的 keys 方法可能触发异常，直接跳过
-                    pass
+            cache.delete_many(['dynamic_model_list', 'dynamic_model_tables'])
+            _bump_cache_ver()
     except Exception as e:
         # 仅记录警告，不中断主流程
         logger.warning(f"缓存清理警告（非关键）：{str(e)}")
@@ -132,12 +119,21 @@ def get_model_by_name(model_name: str) -> Type[models.Model]:
     return model_class
 
 
+@functools.lru_cache(maxsize=256)
+def get_cached_model_with_methods(model_name: str) -> Optional[Type[models.Model]]:
+    """
+    按模型名缓存 get_dynamic_model_with_methods 的结果（进程内），避免每次方法调用都加注册表锁查找；
+    模型类重建（class_prepared）、注销模型、刷新方法时清空
+    """
+    return get_dynamic_model_with_methods(model_name)
+
+
 def get_model_record_count(model_name: str) -> int | str:
     """
     修复：增加数据表存在性校验，避免查询已删除的表
     返回值：记录数（int）| "已删除" | "统计失败"
     """
-    key = f'lowcode_data_count_{model_name}'
+    key = _data_count_key(model_name, _cache_ver())
     cnt = cache.get(key)
     if cnt is None:
         try:
@@ -167,7 +163,76 @@ def get_model_record_count(model_name: str) -> int | str:
     return cnt
 
 
+def _existing_tables() -> Set[str]:
+    """数据库中已存在的表名集合（小写），短 TTL 缓存，避免每次渲染首页都 introspect 一次"""
+    tables = cache.get(EXISTING_TABLES_CACHE_KEY)
+    if tables is None:
+        tables = {t.lower() for t in connection.introspection.table_names()}
+        cache.set(EXISTING_TABLES_CACHE_KEY, tables, EXISTING_TABLES_CACHE_TIMEOUT)
+    return tables
+
+
+@receiver(post_migrate)
+@receiver(post_save, sender=LowCodeModelConfig)
+@receiver(post_delete, sender=LowCodeModelConfig)
+def _clear_existing_tables_cache(sender, **kwargs):
+    """迁移完成或模型配置增删改后，丢弃已存在表名缓存"""
+    cache.delete(EXISTING_TABLES_CACHE_KEY)
+
+
+def get_model_record_counts(model_names: List[str], table_names: Optional[Set[str]] = None) -> Dict[str, int | str]:
+    """
+    批量统计多个动态模型的记录数：未命中缓存的模型合并为一条
+    SELECT %s, COUNT(*) FROM t1 UNION ALL SELECT %s, COUNT(*) FROM t2 ... 查询，结果批量写回缓存。
+    数据表不存在的模型记为 "已删除"；无法解析模型类或批量查询失败时不返回该模型（由调用方回退到 get_model_record_count）。
+    :param model_names: 模型名称列表
+    :param table_names: 已存在的数据表名集合（小写；不传时使用 _existing_tables() 缓存）
+    """
+    ver = _cache_ver()
+    keys = {name: _data_count_key(name, ver) for name in model_names}
+    cached = cache.get_many(list(keys.values()))
+    counts = {name: cached[key] for name, key in keys.items() if key in cached}
+
+    missing = [name for name in model_names if name not in counts]
+    if not missing:
+        return counts
+
+    existing = _existing_tables() if table_names is None else {t.lower() for t in table_names}
+
+    new_values = {}
+    union_tables = []
+    for name in missing:
+        model_class = get_dynamic_model(name)
+        if model_class is None:
+            continue
+        db_table = model_class._meta.db_table
+        if db_table.lower() in existing:
+            union_tables.append((name, db_table))
+        else:
+            new_values[name] = "已删除"
+
+    if union_tables:
+        sql = " UNION ALL ".join(
+            f"SELECT %s, COUNT(*) FROM {connection.ops.quote_name(db_table)}" for _, db_table in union_tables
+        )
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(sql, [name for name, _ in union_tables])
+                new_values.update({name: cnt for name, cnt in cursor.fetchall()})
+        except Exception as e:
+            logger.error(f"批量统计模型记录数失败: {str(e)}")
+
+    if new_values:
+        cache.set_many({keys[name]: cnt for name, cnt in new_values.items()}, CACHE_TIMEOUT)
+        counts.update(new_values)
+    return counts
+
+
+@functools.lru_cache(maxsize=256)
 def build_dynamic_form(model_class: Type[models.Model]) -> Type[forms.ModelForm]:
+    """
+    为模型构建 ModelForm 类（按模型类缓存；与时间/随机数相关的 initial 使用可调用对象，每次实例化时求值）
+    """
     meta_attrs = {'model': model_class, 'fields': '__all__'}
     form_class = type(
         f'{model_class.__name__}Form',
@@ -195,13 +260,13 @@ def configure_form_fields(form_class, model: models.Model):
         },
         models.DateField: {
             'widget': lambda attrs: forms.DateInput(attrs={**attrs, 'type': 'date'}),
-            'initial': lambda mf: date.today() if mf.default is models.NOT_PROVIDED and not (
+            'initial': lambda mf: date.today if mf.default is models.NOT_PROVIDED and not (
                     mf.blank or mf.null) else None
         },
         models.DateTimeField: {
             'widget': lambda attrs: forms.DateTimeInput(attrs={**attrs, 'type': 'datetime-local'}),
-            'initial': lambda mf: timezone.now().strftime(
-                '%Y-%m-%dT%H:%M') if mf.default is models.NOT_PROVIDED and not (mf.blank or mf.null) else None
+            'initial': lambda mf: (lambda: timezone.now().strftime(
+                '%Y-%m-%dT%H:%M')) if mf.default is models.NOT_PROVIDED and not (mf.blank or mf.null) else None
         },
         models.TimeField: {
             'widget': lambda attrs: forms.TimeInput(attrs={**attrs, 'type': 'time'})
@@ -244,10 +309,16 @@ def configure_form_fields(form_class, model: models.Model):
             'queryset': lambda mf: mf.related_model.objects.all().order_by('pk')
         },
         models.UUIDField: {
-            'initial': lambda mf: str(uuid4()) if mf.default is models.NOT_PROVIDED else None
+            'initial': lambda mf: (lambda: str(uuid4())) if mf.default is models.NOT_PROVIDED else None
         }
     }
 
+    # 展开元组键为 {字段类: 配置}，按字段类的 MRO 取最具体的配置（每个字段一次 MRO 查表，替代逐项 isinstance 扫描）
+    config_by_type = {}
+    for field_types, config in field_type_config.items():
+        for field_type in (field_types if isinstance(field_types, tuple) else (field_types,)):
+            config_by_type.setdefault(field_type, config)
+
     for field_name, form_field in form_fields.items():
         model_field = model_fields.get(field_name)
         if not model_field or not hasattr(model_field, 'verbose_name'):
@@ -257,67 +328,84 @@ def configure_form_fields(form_class, model: models.Model):
         form_field.label = label
         base_attrs = get_base_attrs(label, model_field)
 
-        for field_types, config in field_type_config.items():
-            if isinstance(model_field, field_types):
-                if 'widget' in config:
-                    if callable(config['widget']):
-                        form_field.widget = config['widget'](base_attrs)
-                    else:
-                        form_field.widget = config['widget'](attrs=base_attrs)
+        config = next((config_by_type[c] for c in type(model_field).__mro__ if c in config_by_type), None)
+        if config is None:
+            form_field.widget.attrs.update(base_attrs)
+            continue
 
-                if 'attrs_modifier' in config and callable(config['attrs_modifier']):
-                    form_field.widget.attrs = config['attrs_modifier'](model_field, form_field.widget.attrs)
+        if 'widget' in config:
+            if callable(config['widget']):
+                form_field.widget = config['widget'](base_attrs)
+            else:
+                form_field.widget = config['widget'](attrs=base_attrs)
 
-                if 'initial' in config and callable(config['initial']) and form_field.initial is None:
-                    initial_value = config['initial'](model_field)
-                    if initial_value is not None:
-                        form_field.initial = initial_value
+        if 'attrs_modifier' in config and callable(config['attrs_modifier']):
+            form_field.widget.attrs = config['attrs_modifier'](model_field, form_field.widget.attrs)
 
-                if 'queryset' in config and callable(config['queryset']):
-                    form_field.queryset = config['queryset'](model_field)
+        if 'initial' in config and callable(config['initial']) and form_field.initial is None:
+            initial_value = config['initial'](model_field)
+            if initial_value is not None:
+                form_field.initial = initial_value
 
-                break
-        else:
-            form_field.widget.attrs.update(base_attrs)
+        if 'queryset' in config and callable(config['queryset']):
+            form_field.queryset = config['queryset'](model_field)
 
     # 修复：在 enhanced_clean 中使用局部变量 base_attrs 会报错，应重新获取
     original_clean = getattr(form_class, 'clean', lambda self: super(type(self), self).clean())
 
+    # 建表单时预计算每个字段的校验规则 {字段名: (类别, 是否必填, 最小值, 最大值)}，clean 时只做一次字典查找
+    clean_rules = {}
+    for name, mf in model_fields.items():
+        if isinstance(mf, (models.CharField, models.TextField)):
+            kind = 'str'
+        elif isinstance(mf, models.DateTimeField):
+            kind = 'datetime'
+        elif isinstance(mf, models.DateField):
+            kind = 'date'
+        elif isinstance(mf, (models.IntegerField, models.FloatField, models.DecimalField)):
+            kind = 'number'
+        elif isinstance(mf, models.FileField):
+            kind = 'file'
+        else:
+            continue
+        clean_rules[name] = (
+            kind,
+            not (mf.blank or mf.null),
+            getattr(mf, 'min_value', None),
+            getattr(mf, 'max_value', None),
+        )
+
     def enhanced_clean(self):
         cleaned_data = original_clean(self)
         for field_name, value in cleaned_data.items():
-            model_field = model_fields.get(field_name)
-            if not model_field:
+            rule = clean_rules.get(field_name)
+            if rule is None:
                 continue
+            kind, required, min_val, max_val = rule
             label = self[field_name].label or field_name
 
-            # 获取当前字段的 required 状态
-            required = not (model_field.blank or model_field.null)
-
             # 字符串字段去空格
-            if isinstance(model_field, (models.CharField, models.TextField)) and isinstance(value, str):
-                cleaned_data[field_name] = value.strip()
-                if required and not cleaned_data[field_name]:
-                    self.add_error(field_name, f'{label}不能为空')
+            if kind == 'str':
+                if isinstance(value, str):
+                    cleaned_data[field_name] = value.strip()
+                    if required and not cleaned_data[field_name]:
+                        self.add_error(field_name, f'{label}不能为空')
 
             # 日期时间验证
-            elif isinstance(model_field, models.DateField) and value and value > date.today():
+            elif kind == 'date' and value and value > date.today():
                 self.add_error(field_name, f'{label}不能晚于当前日期')
-            elif isinstance(model_field, models.DateTimeField) and value and value > timezone.now():
+            elif kind == 'datetime' and value and value > timezone.now():
                 self.add_error(field_name, f'{label}不能晚于当前时间')
 
             # 数值范围验证
-            elif isinstance(model_field,
-                            (models.IntegerField, models.FloatField, models.DecimalField)) and value is not None:
-                min_val = getattr(model_field, 'min_value', None)
-                max_val = getattr(model_field, 'max_value', None)
+            elif kind == 'number' and value is not None:
                 if min_val is not None and value < min_val:
                     self.add_error(field_name, f'{label}不能小于{min_val}')
                 if max_val is not None and value > max_val:
                     self.add_error(field_name, f'{label}不能大于{max_val}')
 
             # 文件大小验证
-            elif isinstance(model_field, (models.FileField, models.ImageField)) and value and hasattr(value, 'size'):
+            elif kind == 'file' and value and hasattr(value, 'size'):
                 max_size = 10 * 1024 * 1024  # 10MB
                 if value.size > max_size:
                     self.add_error(field_name, f'{label}大小不能超过10MB（当前{value.size // 1024 // 1024}MB）')
@@ -328,22 +416,108 @@ def configure_form_fields(form_class, model: models.Model):
     return form_class
 
 
+# 表单控件类 → 前端控件类型（按控件类的 MRO 查找，子类如 ClearableFileInput 自动命中父类配置）
+_WIDGET_TYPE_MAP = {
+    forms.CheckboxInput: 'checkbox',
+    forms.Textarea: 'ckeditor',
+    forms.FileInput: 'file',
+    forms.Select: 'select',
+    forms.SelectMultiple: 'select',
+}
+
+
+def _widget_type(widget: forms.Widget, model_field) -> str:
+    widget_type = next(
+        (_WIDGET_TYPE_MAP[c] for c in type(widget).__mro__ if c in _WIDGET_TYPE_MAP), 'default'
+    )
+    if widget_type == 'file' and isinstance(model_field, models.ImageField):
+        return 'image'
+    return widget_type
+
+
+@functools.lru_cache(maxsize=256)
+def get_widget_type_map(model_class: Type[models.Model]) -> Dict[str, str]:
+    """按模型类缓存 {字段名: 前端控件类型}（基于 build_dynamic_form 生成的表单字段）"""
+    return {
+        field_name: _widget_type(form_field.widget, model_class._meta.get_field(field_name))
+        for field_name, form_field in build_dynamic_form(model_class).base_fields.items()
+    }
+
+
+@functools.lru_cache(maxsize=256)
+def get_search_field_names(model_class: Type[models.Model]) -> tuple:
+    """按模型类缓存可参与关键字搜索的文本字段名"""
+    return tuple(
+        field.name for field in model_class._meta.fields
+        if isinstance(field, (models.CharField, models.TextField, models.EmailField, models.URLField))
+    )
+
+
+@functools.lru_cache(maxsize=256)
+def get_detail_field_specs(model_class: Type[models.Model]) -> tuple:
+    """
+    按模型类缓存详情页字段描述 (字段, 取值键 attname, 选项映射, 值类别, 前端控件类型)，
+    详情页直接从 values() 字典取值渲染，不再逐请求做 isinstance 判断
+    """
+    specs = []
+    for field in model_class._meta.fields:
+        choice_map = dict(field.flatchoices) if field.choices else None
+        if isinstance(field, models.FileField):
+            kind = 'file'
+        elif isinstance(field, models.DateTimeField):
+            kind = 'datetime'
+        elif isinstance(field, models.DateField):
+            kind = 'date'
+        elif field.is_relation:
+            kind = 'relation'
+        else:
+            kind = None
+        widget_type = 'image' if isinstance(field, models.ImageField) else \
+            'file' if isinstance(field, models.FileField) else \
+                'ckeditor' if isinstance(field, models.TextField) else \
+                    'boolean' if isinstance(field, models.BooleanField) else \
+                        'select' if field.choices else 'default'
+        specs.append((field, field.attname, choice_map, kind, widget_type))
+    return tuple(specs)
+
+
+@functools.lru_cache(maxsize=256)
+def get_field_details(model_class: Type[models.Model]) -> tuple:
+    """按模型类缓存模型配置详情页的字段说明（只读，模板直接遍历）"""
+    return tuple(
+        {
+            'name': field.name,
+            'verbose_name': field.verbose_name or field.name,
+            'field_type': field.__class__.__name__,
+            'blank': field.blank,
+            'null': field.null,
+            'default': field.default if field.default is not models.NOT_PROVIDED else None,
+            'max_length': getattr(field, 'max_length', None),
+            'choices': dict(field.choices) if field.choices else None,
+            'related_model': field.related_model.__name__ if field.related_model else None,
+        }
+        for field in model_class._meta.fields
+    )
+
+
+@receiver(class_prepared)
+def _clear_dynamic_form_cache(sender, **kwargs):
+    """动态模型重建（新模型类注册）时清空表单缓存"""
+    build_dynamic_form.cache_clear()
+    get_widget_type_map.cache_clear()
+    get_search_field_names.cache_clear()
+    get_detail_field_specs.cache_clear()
+    get_field_details.cache_clear()
+    get_cached_model_with_methods.cache_clear()
+
+
 def enhance_form_fields(form, model_class: Type[models.Model]) -> List[Dict[str, Any]]:
+    widget_types = get_widget_type_map(model_class)
     fields_info = []
     for field_name, form_field in form.fields.items():
-        model_field = model_class._meta.get_field(field_name)
-        widget = form_field.widget
-
-        if isinstance(widget, forms.CheckboxInput):
-            widget_type = 'checkbox'
-        elif isinstance(widget, forms.Textarea):
-            widget_type = 'ckeditor'
-        elif isinstance(widget, forms.FileInput):
-            widget_type = 'image' if isinstance(model_field, models.ImageField) else 'file'
-        elif isinstance(widget, (forms.Select, forms.SelectMultiple)):
-            widget_type = 'select'
-        else:
-            widget_type = 'default'
+        widget_type = widget_types.get(field_name)
+        if widget_type is None:
+            widget_type = _widget_type(form_field.widget, model_class._meta.get_field(field_name))
 
         fields_info.append({
             'name': field_name,
@@ -359,14 +533,40 @@ def enhance_form_fields(form, model_class: Type[models.Model]) -> List[Dict[str,
 def get_all_dynamic_model_configs() -> List[ModelConfigType]:
     """修复：过滤已删除数据表的模型配置，避免前端显示无效模型"""
     ensure_dynamic_models_loaded()
-    existing_tables = {t.lower() for t in connection.introspection.table_names()}
+    existing_tables = _existing_tables()
     model_names = list_dynamic_model_names()
+    # 一次查询拿到所有模型的记录数（替代逐个模型 COUNT）
+    record_counts = get_model_record_counts(model_names, existing_tables)
 
     configs_queryset = LowCodeModelConfig.objects.filter(name__in=model_names).only(
         'id', 'name', 'table_name', 'create_time', 'update_time'
     )
     config_map = {cfg.name: cfg for cfg in configs_queryset}
 
+    # 字段数：一次 get_many 读缓存，未命中的模型用一条分组 COUNT 查询补齐后 set_many 回写
+    ver = _cache_ver()
+    field_count_keys = {name: _field_count_key(name, ver) for name in config_map}
+    cached_field_counts = cache.get_many(list(field_count_keys.values()))
+    field_counts = {
+        name: cached_field_counts[key] for name, key in field_count_keys.items() if key in cached_field_counts
+    }
+    missing_configs = [cfg for name, cfg in config_map.items() if name not in field_counts]
+    if missing_configs:
+        try:
+            grouped = dict(
+                FieldModel.objects.filter(model_config__in=missing_configs)
+                .values_list('model_config_id')
+                .annotate(c=Count('id'))
+                .order_by()
+            )
+        except Exception:
+            grouped = {}
+        new_field_counts = {cfg.name: grouped.get(cfg.id, 0) for cfg in missing_configs}
+        cache.set_many(
+            {field_count_keys[name]: cnt for name, cnt in new_field_counts.items()}, CACHE_TIMEOUT
+        )
+        field_counts.update(new_field_counts)
+
     model_configs = []
     for name in model_names:
         config = config_map.get(name)
@@ -375,33 +575,29 @@ def get_all_dynamic_model_configs() -> List[ModelConfigType]:
 
         table = (config.table_name if config and config.table_name else name).lower()
 
-        field_count_key = f'lowcode_field_count_{name}'
-        field_count = cache.get(field_count_key)
-        if field_count is None:
-            if config:
-                try:
-                    field_count = FieldModel.objects.filter(model_config=config).count()
-                except Exception:
-                    field_count = 0
-            else:
-                field_count = 0
-            cache.set(field_count_key, field_count, CACHE_TIMEOUT)
+        field_count = field_counts.get(name, 0)
+
+        exists_in_db = table in existing_tables
+        if field_count > 0 and exists_in_db:
+            status_cn, status_type = '已配置', 'success'
+        elif config is not None and not exists_in_db:
+            status_cn, status_type = '已删除', 'danger'
+        else:
+            status_cn, status_type = '未配置', 'secondary'
 
         # 修复：仅添加数据表存在的模型配置
         model_configs.append({
             'name': name,
             'config': config,
             'has_config': config is not None,
-            'exists_in_db': table in existing_tables,
-            'record_count': get_model_record_count(name),
+            'exists_in_db': exists_in_db,
+            'record_count': record_counts[name] if name in record_counts else get_model_record_count(name),
             'field_count': field_count,
             'table_name': table,
             'create_time': config.create_time if config else None,
             'update_time': config.update_time if config else None,
-            'status_cn': '已配置' if (
-                        config and field_count > 0 and table in existing_tables) else '已删除' if config and table not in existing_tables else '未配置',
-            'status_type': 'success' if (
-                        config and field_count > 0 and table in existing_tables) else 'danger' if config and table not in existing_tables else 'secondary'
+            'status_cn': status_cn,
+            'status_type': status_type
         })
 
     # 过滤掉已删除的模型（可选：保留但标记状态）
@@ -941,19 +1137,7 @@ def dynamic_model_detail(request: HttpRequest, model_name: str):
         model_class = get_model_by_name(model_name)
         model_config = LowCodeModelConfig.objects.filter(name=model_name).first()
 
-        field_details = []
-        for field in model_class._meta.fields:
-            field_details.append({
-                'name': field.name,
-                'verbose_name': field.verbose_name or field.name,
-                'field_type': field.__class__.__name__,
-                'blank': field.blank,
-                'null': field.null,
-                'default': field.default if field.default is not models.NOT_PROVIDED else None,
-                'max_length': getattr(field, 'max_length', None),
-                'choices': dict(field.choices) if field.choices else None,
-                'related_model': field.related_model.__name__ if hasattr(field, 'related_model') else None,
-            })
+        field_details = get_field_details(model_class)
 
         context = {
             'title': f'{model_class._meta.verbose_name} 配置详情',
@@ -1113,17 +1297,29 @@ class DynamicModelListView(LoginRequiredMixin, ListView):
         super().setup(request, *args, **kwargs)
         self.model_name = self.kwargs['model_name']
         self.model_class = get_model_by_name(self.model_name)
+        try:
+            self.after_id = int(request.GET['after_id'])
+        except (KeyError, ValueError):
+            self.after_id = None
+
+    def get_paginate_by(self, queryset):
+        # keyset 翻页（?after_id=）已在 get_queryset 中截取一页，不再走 OFFSET 分页
+        return None if self.after_id is not None else self.paginate_by
 
     def get_queryset(self):
         queryset = self.model_class.objects.all()
         search_query = self.request.GET.get('search', '')
-        if search_query:
+        search_fields = get_search_field_names(self.model_class) if search_query else ()
+        if search_fields:
+            # 保持子串匹配（中文关键字无法按全文检索分词）；动态表建表时尚未创建 trigram 索引
             search_filters = Q()
-            for field in self.model_class._meta.fields:
-                if isinstance(field, (models.CharField, models.TextField, models.EmailField, models.URLField)):
-                    search_filters |= Q(**{f'{field.name}__icontains': search_query})
+            for field_name in search_fields:
+                search_filters |= Q(**{f'{field_name}__icontains': search_query})
             queryset = queryset.filter(search_filters)
-        return queryset.order_by('-id')
+        queryset = queryset.order_by('-id')
+        if self.after_id is not None:
+            queryset = queryset.filter(id__lt=self.after_id)[:self.paginate_by]
+        return queryset
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -1134,9 +1330,21 @@ class DynamicModelListView(LoginRequiredMixin, ListView):
             'verbose_name': meta.verbose_name,
             'verbose_name_plural': meta.verbose_name_plural,
             'search_query': self.request.GET.get('search', ''),
+            'after_id': self.after_id,
+            'next_after': self._next_after(context),
         })
         return context
 
+    def _next_after(self, context):
+        """下一页的 keyset 游标：当前页最后一条记录的 id；已无更多数据时为 None"""
+        page_obj = context.get('page_obj')
+        if page_obj is not None and not page_obj.has_next():
+            return None
+        objects = list(context['object_list'])
+        if len(objects) < self.paginate_by:
+            return None
+        return objects[-1].id
+
 
 class DynamicModelCreateView(LoginRequiredMixin, CreateView):
     template_name = 'lowcode/dynamic_model_form.html'
@@ -1174,29 +1382,29 @@ class DynamicModelDetailView(LoginRequiredMixin, DetailView):
         self.model_class = get_model_by_name(self.model_name)
 
     def get_object(self, queryset=None):
-        return get_object_or_404(self.model_class, pk=self.kwargs['pk'])
+        # 只读详情：取字段原始值字典，不实例化模型；补充 pk 键供模板 object.pk 使用
+        values = get_object_or_404(self.model_class.objects.values(), pk=self.kwargs['pk'])
+        values['pk'] = values[self.model_class._meta.pk.attname]
+        return values
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         enhanced_fields = []
-        for field in self.model_class._meta.fields:
-            value = getattr(self.object, field.name)
-            display_value = getattr(self.object, f'get_{field.name}_display')() if field.choices else value
+        for field, attname, choice_map, kind, widget_type in get_detail_field_specs(self.model_class):
+            value = self.object[attname]
+            display_value = choice_map.get(value, value) if choice_map is not None else value
 
-            if isinstance(field, models.FileField) and value:
+            if kind == 'file' and value:
+                # 文件字段按需构造 FieldFile，模板中的 .url/.name/.size 保持可用
+                value = field.attr_class(None, field, value)
                 display_value = f'<a href="{value.url}" target="_blank">下载文件</a>'
-            elif isinstance(field, models.ImageField) and value:
-                display_value = f'<img src="{value.url}" style="max-width: 200px; max-height: 200px;" alt="预览图">'
-            elif isinstance(field, (models.DateField, models.DateTimeField)) and value:
-                display_value = value.strftime('%Y-%m-%d %H:%M:%S') if isinstance(field,
-                                                                                  models.DateTimeField) else value.strftime(
-                    '%Y-%m-%d')
-
-            widget_type = 'image' if isinstance(field, models.ImageField) else \
-                'file' if isinstance(field, models.FileField) else \
-                    'ckeditor' if isinstance(field, models.TextField) else \
-                        'boolean' if isinstance(field, models.BooleanField) else \
-                            'select' if field.choices else 'default'
+            elif kind == 'datetime' and value:
+                display_value = value.strftime('%Y-%m-%d %H:%M:%S')
+            elif kind == 'date' and value:
+                display_value = value.strftime('%Y-%m-%d')
+            elif kind == 'relation' and value is not None:
+                value = field.related_model._default_manager.filter(pk=value).first()
+                display_value = value
 
             enhanced_fields.append({
                 'label': field.verbose_name or field.name,
@@ -1389,6 +1597,7 @@ def refresh_methods(request: HttpRequest):
         if not model_name:
             return JsonResponse({"code": 400, "msg": "缺少模型名称参数"}, status=400)
 
+        get_cached_model_with_methods.cache_clear()
         refresh_dynamic_methods(model_name)
 
         # 清除缓存（兼容所有缓存后端）
@@ -1414,7 +1623,7 @@ def call_dynamic_method(request: HttpRequest, model_name: str, instance_id: int,
         return JsonResponse({"code": 403, "msg": "无权限"}, status=403)
 
     try:
-        DynamicModel = get_dynamic_model_with_methods(model_name)
+        DynamicModel = get_cached_model_with_methods(model_name)
         if DynamicModel is None:
             raise Http404("模型不存在")
 
@@ -1493,6 +1702,7 @@ def unregister_dynamic_model(model_name: str, clear_cache: bool = True, delete_t
     :param delete_table: 是否删除数据表和数据
     """
     # 1. 注销模型（从apps中移除）
+    get_cached_model_with_methods.cache_clear()
     app_label = 'lowcode'  # 修复：改为正确的app标签
     model_key = f'{app_label}.{model_name.lower()}'
     if app_label in apps.all_models and model_name.lower() in apps.all_models[app_label]:
@@ -1,31 +1,35 @@
 # 非动态模型代码（首页、仪表盘、日志导出、权限管理、用户管理、监控指标等）
+import functools
 import logging
 import os
-import re
 import json
+import posixpath
+import time
 from datetime import datetime, date
+from pathlib import Path
 from uuid import uuid4
 from typing import Any, Dict, List, Type, Optional
+from urllib.parse import quote
 
 from django.apps import apps
 from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib.auth.models import User
-from django.core.exceptions import PermissionDenied, ValidationError
+from django.core.exceptions import PermissionDenied, SuspiciousFileOperation
 from django.db import connection, models
-from django.db.models import Q
-from django.http import Http404, HttpResponse, FileResponse, JsonResponse, HttpRequest
+from django.http import Http404, HttpResponse, FileResponse, JsonResponse, HttpRequest, StreamingHttpResponse
 from django.shortcuts import render, get_object_or_404
 from django.urls import reverse
 from django.views.generic import ListView, CreateView, DetailView, UpdateView, DeleteView
 from django import forms
 from django.contrib.admin.views.decorators import staff_member_required
 from django.core.cache import cache
+from django.core.signals import setting_changed
+from django.dispatch import receiver
 from django.utils.text import capfirst
 from django.utils import timezone
 from django.template.response import TemplateResponse
-from prometheus_client import generate_latest, CONTENT_TYPE_LATEST
 from rest_framework.viewsets import ReadOnlyModelViewSet
 from rest_framework.filters import SearchFilter, OrderingFilter
 from rest_framework.pagination import PageNumberPagination
@@ -44,15 +48,24 @@ from lowcode.api.serializers import (
     BatchDataPermissionSerializer,
     BatchRevokeDataPermissionSerializer,
 )
-from lowcode.io.excel import generate_method_log_excel
-from lowcode.tasks import async_export_method_log
+from lowcode.io.excel import METHOD_LOG_FILTER_MAP, apply_method_log_filters, iter_method_log_csv
+from lowcode.tasks import EXPORT_EXCEL_MAX_RECORDS, async_export_method_log
+from celery.result import AsyncResult
 import django
 
 # Config
 ALLOWED_MODELS = getattr(settings, 'LOWCODE_ALLOWED_MODELS', None)
 EXPORT_MAX_RECORDS = getattr(settings, 'LOWCODE_EXPORT_MAX_RECORDS', 50000)
 EXPORT_SUBDIR = getattr(settings, 'LOWCODE_EXPORT_SUBDIR', 'lowcode_exports/').rstrip('/') + '/'
+# 导出文件交给前置 Web 服务器直接发送：nginx 内部 location 前缀（X-Accel-Redirect）或 Apache mod_xsendfile
+EXPORT_ACCEL_REDIRECT_PREFIX = getattr(settings, 'LOWCODE_EXPORT_ACCEL_REDIRECT_PREFIX', None)
+EXPORT_X_SENDFILE = getattr(settings, 'LOWCODE_EXPORT_X_SENDFILE', False)
+XLSX_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+# 批量撤销权限：每批原生 DELETE 的行数；需要触发 pre/post_delete 信号时开启 FIRE_SIGNALS 走 ORM delete()
+REVOKE_DELETE_BATCH = getattr(settings, 'LOWCODE_REVOKE_DELETE_BATCH', 10000)
+REVOKE_FIRE_SIGNALS = getattr(settings, 'LOWCODE_REVOKE_FIRE_SIGNALS', False)
 CACHE_TIMEOUT = 60  # 统一缓存超时时间
+METRICS_CACHE_SECONDS = getattr(settings, 'LOWCODE_METRICS_CACHE_SECONDS', 2)  # 指标输出进程内缓存时长
 
 logger = logging.getLogger(__name__)
 
@@ -61,28 +74,73 @@ ModelConfigType = Dict[str, Any]
 OverviewDataType = Dict[str, Any]
 
 # ========== 通用工具函数 ==========
-def _sanitize_filename(filename: str) -> str:
-    """清理文件名，避免非法字符"""
-    if not re.match(r'^[a-zA-Z0-9._\-]+$', filename):
-        raise ValidationError("文件名仅允许字母、数字、下划线、连字符和点")
-    return filename
-
-def _apply_log_filters(queryset, params: Dict[str, Any]):
-    """应用日志过滤条件（优化过滤逻辑）"""
-    filters = Q()
-    if params.get("user"):
-        filters &= Q(user_id=params["user"])
-    if params.get("model_name"):
-        filters &= Q(model_name__icontains=params["model_name"])
-    if params.get("method_name"):
-        filters &= Q(method_name__icontains=params["method_name"])
-    if params.get("result_status"):
-        filters &= Q(result_status=params["result_status"])
-    if params.get("start_time"):
-        filters &= Q(call_time__gte=params["start_time"])
-    if params.get("end_time"):
-        filters &= Q(call_time__lte=params["end_time"])
-    return queryset.filter(filters) if filters else queryset
+@functools.lru_cache(maxsize=32)
+def _static_url(view_name: str) -> str:
+    """无参数路由的 URL（进程内只 reverse 一次）"""
+    return reverse(view_name)
+
+@receiver(setting_changed)
+def _clear_static_url_cache(*, setting, **kwargs):
+    if setting == "ROOT_URLCONF":
+        _static_url.cache_clear()
+
+def _is_within_export_dir(file_path: str) -> bool:
+    """规范化路径后判断文件是否位于导出目录内（拦截 ../ 路径穿越与指向目录外的符号链接）"""
+    try:
+        root = Path(default_storage.path(EXPORT_SUBDIR)).resolve()
+        target = Path(default_storage.path(file_path)).resolve()
+    except NotImplementedError:  # 非本地文件系统存储：按规范化后的相对路径判断
+        return posixpath.normpath(file_path).startswith(EXPORT_SUBDIR)
+    except SuspiciousFileOperation:  # 已越出存储根目录
+        return False
+    return target != root and target.is_relative_to(root)
+
+_LOG_PARAM_KEYS = tuple(key for key, _ in METHOD_LOG_FILTER_MAP)
+
+def _log_query_params(request) -> Dict[str, Any]:
+    """单次遍历提取请求中出现的日志筛选参数（每个键只查一次 QueryDict）"""
+    query_params = request.query_params
+    return {key: value for key in _LOG_PARAM_KEYS if (value := query_params.get(key)) is not None}
+
+def _raw_delete_in_batches(queryset, batch_size: int = REVOKE_DELETE_BATCH) -> int:
+    """按主键分批执行原生 DELETE（不实例化模型、不发送删除信号），缩短单条语句的锁持有时间，返回删除行数"""
+    deleted = 0
+    while True:
+        ids = list(queryset.values_list("pk", flat=True)[:batch_size])
+        if not ids:
+            return deleted
+        deleted += queryset.model._base_manager.filter(pk__in=ids)._raw_delete(queryset.db)
+
+def _over_limit(queryset, limit: int) -> bool:
+    """是否超过 limit 行：只探测第 limit+1 行是否存在（OFFSET limit LIMIT 1），不做全表 COUNT"""
+    return queryset.values("pk")[limit:limit + 1].exists()
+
+def _start_log_export(request, params: Dict[str, Any], queryset):
+    """
+    投递日志导出 Celery 任务，返回 202 + task_id 及进度/下载地址（同步、异步导出接口共用）
+
+    记录数超过 EXPORT_EXCEL_MAX_RECORDS 时不投递任务，直接返回 400
+    """
+    if _over_limit(queryset, EXPORT_EXCEL_MAX_RECORDS):
+        return Response({
+            "code": 400,
+            "msg": f"导出记录数超过最大限制 ({EXPORT_EXCEL_MAX_RECORDS})",
+            "data": {"max_records": EXPORT_EXCEL_MAX_RECORDS}
+        }, status=400)
+
+    task = async_export_method_log.delay(params, user_id=request.user.id)
+    progress_url = f"{_static_url('lowcode:export-progress')}?task_id={task.id}"
+    download_url = f"{_static_url('lowcode:download-export')}?task_id={task.id}"
+    return Response({
+        "code": 202,
+        "msg": "导出任务已启动，请查询进度",
+        "data": {
+            "task_id": task.id,
+            "query_params": params,
+            "progress_url": request.build_absolute_uri(progress_url),
+            "download_url": request.build_absolute_uri(download_url),
+        }
+    }, status=status.HTTP_202_ACCEPTED)
 
 # ========== 核心页面视图 ==========
 def designer_view(request):
@@ -106,11 +164,15 @@ def index_view(request: HttpRequest):
         # 获取所有模型配置（带缓存优化）
         model_configs = get_all_dynamic_model_configs()
 
-        # 计算首页统计数据（用于数据概览区域）
+        # 计算首页统计数据（用于数据概览区域），单次遍历累加
         total_models = len(model_configs)
-        created_table_count = sum(1 for cfg in model_configs if cfg['exists_in_db'])
-        total_fields = sum(cfg['field_count'] for cfg in model_configs)
-        total_records = sum(cfg['record_count'] for cfg in model_configs if cfg['record_count'] != -1)
+        created_table_count = total_fields = total_records = 0
+        for cfg in model_configs:
+            created_table_count += cfg['exists_in_db']
+            total_fields += cfg['field_count']
+            record_count = cfg['record_count']
+            if isinstance(record_count, int) and record_count >= 0:  # 跳过 "已删除"/"统计失败" 等状态值
+                total_records += record_count
 
         # 获取 Django 版本
         django_version = django.get_version()
@@ -152,26 +214,24 @@ def dashboard_view(request: HttpRequest):
     total_models = len(app_models)
     total_data = 0
 
-    # 使用缓存批量统计
-    for model in app_models:
-        cache_key = f'lowcode_data_count_{model.__name__}'
-        cnt = cache.get(cache_key)
-        if cnt is None:
-            try:
-                cnt = model.objects.count()
-                cache.set(cache_key, cnt, CACHE_TIMEOUT)
-            except Exception as e:
-                logger.warning(f"统计模型 '{model.__name__}' 记录数失败: {str(e)}")
-                cnt = 0
-        total_data += cnt
-
+    # 使用缓存批量统计：get_many 一次读缓存，未命中的模型合并为一条 UNION ALL 查询；
+    # 批量未覆盖的模型回退到与首页一致的 get_model_record_count（同一缓存键）
+    from lowcode.views.dynamic_model import get_model_record_count, get_model_record_counts
+    model_names = [model.__name__ for model in app_models]
+    counts = get_model_record_counts(model_names)
+    for name in model_names:
+        cnt = counts[name] if name in counts else get_model_record_count(name)
+        if isinstance(cnt, int):  # 跳过 "已删除"/"统计失败" 等状态值
+            total_data += cnt
+
+    model_list_url = _static_url('lowcode:model-list')  # 对应优化后的路由名称（kebab-case）
     overview_data: List[OverviewDataType] = [
         {
             'label': '动态模型总数',
             'value': total_models,
             'color': 'primary',
             'icon': 'bi-diagram-3',
-            'url': reverse('lowcode:model-list'),  # 对应优化后的路由名称（kebab-case）
+            'url': model_list_url,
             'action_text': '前往管理'
         },
         {
@@ -179,7 +239,7 @@ def dashboard_view(request: HttpRequest):
             'value': total_data,
             'color': 'success',
             'icon': 'bi-database',
-            'url': reverse('lowcode:model-list'),  # 对应优化后的路由名称（kebab-case）
+            'url': model_list_url,
             'action_text': '查看详情'
         },
     ]
@@ -213,12 +273,16 @@ class DynamicMethodCallLogViewSet(ReadOnlyModelViewSet):
     pagination_class = StandardResultsSetPagination
 
     def get_queryset(self):
-        queryset = LowCodeMethodCallLog.objects.all()
+        # 序列化器读取 user.username：JOIN 一次取回，避免逐行查询用户表；only 限定为序列化器实际使用的列
+        queryset = LowCodeMethodCallLog.objects.select_related('user').only(
+            'id', 'user__id', 'user__username', 'model_name', 'method_name', 'params',
+            'result_status', 'result_data', 'exception_msg', 'call_time', 'time_cost'
+        )
         params = {
             "start_time": self.request.query_params.get("start_time"),
             "end_time": self.request.query_params.get("end_time")
         }
-        return _apply_log_filters(queryset, params)
+        return apply_method_log_filters(queryset, params)
 
 class BatchDataPermissionView(APIView):
     """批量数据权限授权API"""
@@ -229,69 +293,70 @@ class BatchDataPermissionView(APIView):
         serializer.is_valid(raise_exception=True)
         data = serializer.validated_data
 
-        # 去重处理，避免重复授权
-        existing_perms = DataPermission.objects.filter(
-            user_id__in=data["user_ids"],
-            model_name=data["model_name"],
-            data_id__in=data["data_ids"]
-        ).values_list('user_id', 'data_id')
-        existing_set = set(existing_perms)
-
-        objs = []
-        for u in data["user_ids"]:
-            for d in data["data_ids"]:
-                if (u, d) not in existing_set:
-                    objs.append(DataPermission(user_id=u, model_name=data["model_name"], data_id=d))
-
-        if objs:
-            DataPermission.objects.bulk_create(objs, batch_size=100)
+        # 请求中重复的 id 先去重（保持顺序），否则重复组合会被 ignore_conflicts 静默丢弃、导致新增数偏大
+        user_ids = list(dict.fromkeys(data["user_ids"]))
+        data_ids = list(dict.fromkeys(data["data_ids"]))
+        model_name = data["model_name"]
+
+        # 去重交给数据库：(user, model_name, data_id) 已有唯一约束，ON CONFLICT DO NOTHING 跳过已授权组合；
+        # 插入前只做一次 COUNT 用于统计重复数，不再拉取已有组合到 Python 中逐一比对
+        existing_count = DataPermission.objects.filter(
+            user_id__in=user_ids,
+            model_name=model_name,
+            data_id__in=data_ids
+        ).count()
+
+        objs = [
+            DataPermission(user_id=u, model_name=model_name, data_id=d)
+            for u in user_ids
+            for d in data_ids
+        ]
+        DataPermission.objects.bulk_create(objs, batch_size=1000, ignore_conflicts=True)
+        created_count = max(len(objs) - existing_count, 0)
 
         return Response({
             "code": 200,
-            "msg": f"成功授权{len(data['user_ids'])}个用户访问{len(data['data_ids'])}条{data['model_name']}数据（新增{len(objs)}条权限）",
+            "msg": f"成功授权{len(user_ids)}个用户访问{len(data_ids)}条{model_name}数据（新增{created_count}条权限）",
             "data": {
-                "user_ids": data["user_ids"],
-                "data_ids": data["data_ids"],
-                "model_name": data["model_name"],
-                "total_count": len(objs),
-                "duplicate_count": len(data["user_ids"]) * len(data["data_ids"]) - len(objs)
+                "user_ids": user_ids,
+                "data_ids": data_ids,
+                "model_name": model_name,
+                "total_count": created_count,
+                "duplicate_count": len(objs) - created_count
             }
         })
 
 class MethodLogExportView(APIView):
-    """方法调用日志导出API"""
+    """
+    方法调用日志导出API
+
+    - 默认：投递 Celery 任务生成 Excel（write-only 逐行写入，最多 EXPORT_EXCEL_MAX_RECORDS 条），立即返回 202 + task_id，
+      通过 export-progress 查询进度、download-export?task_id=... 下载
+    - export_format=csv：流式输出 CSV（游标分批读取，内存占用与总行数无关），
+      最多导出 EXPORT_MAX_RECORDS 条，超出时末行给出截断提示
+    """
     permission_classes = [IsAdminUser]
 
     def get(self, request):
         queryset = LowCodeMethodCallLog.objects.all()
-        params = {k: request.query_params.get(k) for k in
-                  ["user", "model_name", "method_name", "result_status", "start_time", "end_time"]}
-        queryset = _apply_log_filters(queryset, params)
+        params = _log_query_params(request)
+        queryset = apply_method_log_filters(queryset, params)
 
-        record_count = queryset.count()
-        if record_count > EXPORT_MAX_RECORDS:
-            return Response({
-                "code": 400,
-                "msg": f"导出记录数超过最大限制 ({EXPORT_MAX_RECORDS})，当前{record_count}条",
-                "data": {"max_records": EXPORT_MAX_RECORDS, "current_count": record_count}
-            }, status=400)
+        if request.query_params.get("export_format") == "csv":
+            return self._stream_csv(queryset)
 
-        try:
-            excel_buffer = generate_method_log_excel(queryset)
-            response = HttpResponse(
-                excel_buffer.getvalue(),
-                content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-            )
-            current_date = datetime.now().strftime("%Y%m%d_%H%M%S")
-            response["Content-Disposition"] = f'attachment; filename="动态方法调用日志_{current_date}.xlsx"'
-            excel_buffer.close()
-            return response
-        except Exception as e:
-            logger.exception("导出方法调用日志失败")
-            return Response({
-                "code": 500,
-                "msg": f"导出失败：{str(e)}"
-            }, status=500)
+        # Excel 生成始终移出请求线程：Web worker 只负责投递任务
+        return _start_log_export(request, params, queryset)
+
+    @staticmethod
+    def _stream_csv(queryset):
+        response = StreamingHttpResponse(
+            iter_method_log_csv(queryset.order_by("-call_time"), max_rows=EXPORT_MAX_RECORDS),
+            content_type="text/csv; charset=utf-8"
+        )
+        current_date = datetime.now().strftime("%Y%m%d_%H%M%S")
+        response["Content-Disposition"] = f'attachment; filename="动态方法调用日志_{current_date}.csv"'
+        return response
 
 class BatchRevokeDataPermissionView(APIView):
     """批量撤销数据权限API"""
@@ -302,21 +367,26 @@ class BatchRevokeDataPermissionView(APIView):
         serializer.is_valid(raise_exception=True)
         data = serializer.validated_data
 
-        q = Q()
+        filters = {}
         if data.get("user_ids"):
-            q &= Q(user_id__in=data["user_ids"])
+            filters["user_id__in"] = data["user_ids"]
         if data.get("model_name"):
-            q &= Q(model_name=data["model_name"])
+            filters["model_name"] = data["model_name"]
         if data.get("data_ids"):
-            q &= Q(data_id__in=data["data_ids"])
+            filters["data_id__in"] = data["data_ids"]
 
-        if not q:
+        if not filters:
             return Response({
                 "code": 400,
                 "msg": "至少需要指定一个筛选条件（user_ids/model_name/data_ids）"
             }, status=400)
 
-        deleted_count, _ = DataPermission.objects.filter(q).delete()
+        queryset = DataPermission.objects.filter(**filters)
+        if REVOKE_FIRE_SIGNALS:
+            deleted_count, _ = queryset.delete()
+        else:
+            # DataPermission 无级联与信号接收者，直接分批原生删除
+            deleted_count = _raw_delete_in_batches(queryset)
         return Response({
             "code": 200,
             "msg": f"成功撤销{deleted_count}条数据权限",
@@ -329,37 +399,13 @@ class BatchRevokeDataPermissionView(APIView):
         })
 
 class AsyncExportMethodLogView(APIView):
-    """异步导出方法调用日志API"""
+    """异步导出方法调用日志API（与 MethodLogExportView 默认的 Excel 导出共用任务投递逻辑与记录数上限）"""
     permission_classes = [IsAdminUser]
 
     def get(self, request):
-        params = {k: v for k, v in {
-            "user": request.query_params.get("user"),
-            "model_name": request.query_params.get("model_name"),
-            "result_status": request.query_params.get("result_status"),
-            "start_time": request.query_params.get("start_time"),
-            "end_time": request.query_params.get("end_time"),
-        }.items() if v is not None}
-
-        # 预检查记录数
-        queryset = _apply_log_filters(LowCodeMethodCallLog.objects.all(), params)
-        if queryset.count() > EXPORT_MAX_RECORDS * 5:  # 异步导出限制放宽5倍
-            return Response({
-                "code": 400,
-                "msg": f"导出记录数超过最大限制 ({EXPORT_MAX_RECORDS * 5})",
-                "data": {"max_records": EXPORT_MAX_RECORDS * 5, "current_count": queryset.count()}
-            }, status=400)
-
-        task = async_export_method_log.delay(params)
-        return Response({
-            "code": 200,
-            "msg": "导出任务已启动，请查询进度",
-            "data": {
-                "task_id": task.id,
-                "query_params": params,
-                "estimated_count": queryset.count()
-            }
-        })
+        params = _log_query_params(request)
+        queryset = apply_method_log_filters(LowCodeMethodCallLog.objects.all(), params)
+        return _start_log_export(request, params, queryset)
 
 class ExportProgressView(APIView):
     """导出进度查询API"""
@@ -371,11 +417,15 @@ class ExportProgressView(APIView):
             return Response({"code": 400, "msg": "缺少task_id参数"}, status=400)
 
         progress = cache.get(f"export_progress_{task_id}")
+        state = AsyncResult(task_id).state
         if progress is None:
-            return Response({"code": 404, "msg": "任务不存在或已过期（有效期24小时）"}, status=404)
+            if state == "PENDING":  # 未知 task_id 在 Celery 中同样表现为 PENDING
+                return Response({"code": 404, "msg": "任务不存在或已过期（有效期24小时）"}, status=404)
+            progress = 100 if state == "SUCCESS" else 0
 
         data = {
             "task_id": task_id,
+            "state": state,
             "progress": progress,
             "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         }
@@ -384,7 +434,7 @@ class ExportProgressView(APIView):
             file_path = cache.get(f"export_file_{task_id}")
             if file_path and default_storage.exists(file_path):
                 data["download_url"] = request.build_absolute_uri(
-                    f"/lowcode/api/v1/download-export/?file_path={file_path}")
+                    f"{_static_url('lowcode:download-export')}?task_id={task_id}")
                 data["msg"] = "导出完成，可下载"
             else:
                 data["msg"] = "导出完成，但文件不存在"
@@ -402,36 +452,82 @@ class DownloadExportView(APIView):
 
     def get(self, request):
         file_path = request.query_params.get("file_path")
+        task_id = request.query_params.get("task_id")
+        if not file_path and task_id:
+            # 按任务ID下载：优先取进度缓存中的文件路径，过期后回退到 Celery 任务结果
+            file_path = cache.get(f"export_file_{task_id}")
+            if not file_path:
+                result = AsyncResult(task_id)
+                file_path = result.result if result.successful() and isinstance(result.result, str) else None
+            if not file_path:
+                return Response({"code": 404, "msg": "导出文件尚未生成或已过期"}, status=404)
         if not file_path:
-            return Response({"code": 400, "msg": "缺少file_path参数"}, status=400)
+            return Response({"code": 400, "msg": "缺少file_path或task_id参数"}, status=400)
 
         # 安全检查
-        if not file_path.startswith(EXPORT_SUBDIR):
+        if not _is_within_export_dir(file_path):
             return Response({"code": 400, "msg": "非法文件路径"}, status=400)
 
         try:
             filename = os.path.basename(file_path)
-            _sanitize_filename(filename)
+            # 直接打开文件时不预先 exists()，文件缺失时按 404 处理（远程存储少一次往返）
+            return self._file_response(file_path, filename)
+        except (FileNotFoundError, SuspiciousFileOperation):
+            return Response({"code": 404, "msg": "文件不存在或已过期"}, status=404)
+        except Exception as e:
+            logger.exception(f"下载文件失败：{file_path}")
+            return Response({"code": 500, "msg": f"下载失败：{str(e)}"}, status=500)
+
+    @staticmethod
+    def _file_response(file_path: str, filename: str):
+        """
+        优先由前置服务器发送文件（X-Accel-Redirect / X-Sendfile），其次用真实文件句柄交给
+        wsgi.file_wrapper（可走 sendfile 零拷贝），仅远程存储回退到 Python 分块读取
 
+        交给前置服务器前先确认文件存在：文件缺失时抛出 FileNotFoundError，由调用方返回 JSON 404，
+        而不是前置服务器的裸 404 页面
+        """
+        if EXPORT_ACCEL_REDIRECT_PREFIX:
             if not default_storage.exists(file_path):
-                return Response({"code": 404, "msg": "文件不存在或已过期"}, status=404)
+                raise FileNotFoundError(file_path)
+            response = HttpResponse(content_type=XLSX_CONTENT_TYPE)
+            response["X-Accel-Redirect"] = EXPORT_ACCEL_REDIRECT_PREFIX.rstrip('/') + '/' + quote(file_path)
+            response["Content-Disposition"] = f'attachment; filename="{filename}"'
+            return response
+
+        try:
+            abs_path = default_storage.path(file_path)
+        except NotImplementedError:  # 非本地文件系统存储（如 OSS/S3）
+            abs_path = None
 
-            file = default_storage.open(file_path, 'rb')
-            response = FileResponse(file,
-                                    content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
+        if abs_path and EXPORT_X_SENDFILE:
+            if not default_storage.exists(file_path):
+                raise FileNotFoundError(file_path)
+            response = HttpResponse(content_type=XLSX_CONTENT_TYPE)
+            response["X-Sendfile"] = abs_path
             response["Content-Disposition"] = f'attachment; filename="{filename}"'
             return response
-        except ValidationError as e:
-            return Response({"code": 400, "msg": str(e)}, status=400)
-        except Exception as e:
-            logger.exception(f"下载文件失败：{file_path}")
-            return Response({"code": 500, "msg": f"下载失败：{str(e)}"}, status=500)
+
+        file = open(abs_path, 'rb') if abs_path else default_storage.open(file_path, 'rb')
+        return FileResponse(file, as_attachment=True, filename=filename, content_type=XLSX_CONTENT_TYPE)
 
 # ========== Misc Views ==========
+# 进程内指标缓存：(编码后的指标文本, 生成时刻)；指标注册表本身即按进程划分，无需跨进程共享
+_METRICS_CACHE = {}
+
 def prometheus_metrics(request: HttpRequest):
-    """Prometheus监控指标视图"""
+    """
+    Prometheus监控指标视图（prometheus_client 仅在访问该接口时导入，不拖慢 worker 启动）
+    METRICS_CACHE_SECONDS 内的多次抓取复用同一份 generate_latest() 输出
+    """
     try:
-        return HttpResponse(generate_latest(), content_type=CONTENT_TYPE_LATEST)
+        from prometheus_client import generate_latest, CONTENT_TYPE_LATEST
+        now = time.monotonic()
+        body, generated_at = _METRICS_CACHE.get("body", (None, 0.0))
+        if body is None or now - generated_at > METRICS_CACHE_SECONDS:
+            body = generate_latest()
+            _METRICS_CACHE["body"] = (body, now)
+        return HttpResponse(body, content_type=CONTENT_TYPE_LATEST)
     except Exception as e:
         logger.exception("获取监控指标失败")
         return HttpResponse(status=500)
@@ -459,12 +555,13 @@ def create_lowcode_user_example(request: HttpRequest):
             "status": "success" if created else "updated",
             "msg": "示例用户创建/更新成功",
             "data": {
-                "username": lowcode_user.user.username,
-                "email": lowcode_user.user.email,
+                # 直接使用已取到的 User/Role 对象，避免 update 分支再次查询关联对象
+                "username": django_user.username,
+                "email": django_user.email,
                 "employee_id": lowcode_user.employee_id,
                 "department": lowcode_user.department,
                 "phone": lowcode_user.phone,
-                "role": lowcode_user.role.name if lowcode_user.role else None
+                "role": role.name
             }
         })
     except Exception as e:
@@ -475,7 +572,7 @@ def create_lowcode_user_example(request: HttpRequest):
 def get_lowcode_user_detail(request: HttpRequest, user_id: int):
     """获取低代码用户详情视图（限制管理员权限）"""
     try:
-        lowcode_user = get_object_or_404(LowCodeUser, user_id=user_id)
+        lowcode_user = get_object_or_404(LowCodeUser.objects.select_related('user', 'role'), user_id=user_id)
         return JsonResponse({
             "code": 200,
             "data": {
@@ -510,7 +607,11 @@ class APIRootView(APIView):
                 "方法调用日志": request.build_absolute_uri("method-call-logs/"),
                 "批量数据权限": request.build_absolute_uri("batch-data-permission/"),
                 "日志导出": request.build_absolute_uri("export-method-logs/"),
-                "异步日志导出": request.build_absolute_uri("async-export-method-logs/")
+                "异步日志导出": request.build_absolute_uri("async-export-method-logs/"),
+                "导出进度": request.build_absolute_uri("export-progress/"),
+                "导出文件下载": request.build_absolute_uri("download-export/")
             },
+            "export_contract": "日志导出均为异步任务：返回 202 及 task_id，轮询 导出进度?task_id= 至 progress=100 后，"
+                               "通过 导出文件下载?task_id= 获取 Excel；日志导出传 export_format=csv 时直接流式下载 CSV",
             "notice": "生产环境建议限制API访问IP，避免敏感操作泄露"
         })
\ No newline at end of file
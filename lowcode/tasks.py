@@ -2,7 +2,6 @@
 import logging
 import os
 import uuid
-from io import BytesIO
 from typing import Any, Dict, List
 import json
 import traceback
@@ -17,7 +16,7 @@ from django.apps import apps
 from celery import shared_task
 
 from .models import LowCodeMethodCallLog, LowCodeModelConfig, ModelUpgradeRecord
-from lowcode.io.excel import generate_method_log_excel
+from lowcode.io.excel import XLSX_MAX_DATA_ROWS, apply_method_log_filters, generate_method_log_excel
 from .models.dynamic_model_factory import get_dynamic_model, refresh_dynamic_model
 from .core.ddl_executor import create_table_if_not_exists
 
@@ -25,8 +24,9 @@ logger = logging.getLogger(__name__)
 
 # === 配置项 ===
 EXPORT_SUBDIR = getattr(settings, 'LOWCODE_EXPORT_SUBDIR', 'lowcode_exports/')
-EXPORT_MAX_RECORDS = getattr(settings, 'LOWCODE_EXPORT_MAX_RECORDS', 100_000)
 EXPORT_CACHE_TIMEOUT = getattr(settings, 'LOWCODE_EXPORT_CACHE_TIMEOUT', 3600)  # 1小时
+# 日志 Excel 导出行数上限（同步/异步导出接口共用）：LOWCODE_EXPORT_MAX_RECORDS 的 5 倍，且不超过 xlsx 单表行数
+EXPORT_EXCEL_MAX_RECORDS = min(getattr(settings, 'LOWCODE_EXPORT_MAX_RECORDS', 50000) * 5, XLSX_MAX_DATA_ROWS)
 
 
 def _get_export_storage_path(filename: str) -> str:
@@ -39,9 +39,9 @@ def _get_export_storage_path(filename: str) -> str:
 # ────────────────────────────────────────
 
 @shared_task(bind=True, max_retries=2)
-def async_export_method_log(self, filter_params: dict):
+def async_export_method_log(self, filter_params: dict, user_id: int = None):
     """
-    异步导出方法调用日志为 Excel 文件。
+    异步导出方法调用日志为 Excel 文件，写入 default_storage 的 EXPORT_SUBDIR/method_log_<task_id>.xlsx。
     """
     task_id = self.request.id
     progress_key = f"export_progress_{task_id}"
@@ -57,48 +57,37 @@ def async_export_method_log(self, filter_params: dict):
         logger.error(f"[ERROR] [Export Task {task_id}] Error: {msg}")
 
     try:
-        logger.info(f"[OK] [Export Task {task_id}] Started with filters: {filter_params}")
+        logger.info(f"[OK] [Export Task {task_id}] Started by user_id={user_id} with filters: {filter_params}")
         _set_progress(0)
 
-        queryset = LowCodeMethodCallLog.objects.all()
-        if filter_params.get("user"):
-            queryset = queryset.filter(user_id=filter_params["user"])
-        if filter_params.get("model_name"):
-            queryset = queryset.filter(model_name__icontains=filter_params["model_name"])
-        if filter_params.get("result_status"):
-            queryset = queryset.filter(result_status=filter_params["result_status"])
-        if filter_params.get("start_time"):
-            queryset = queryset.filter(call_time__gte=filter_params["start_time"])
-        if filter_params.get("end_time"):
-            queryset = queryset.filter(call_time__lte=filter_params["end_time"])
-
-        total_count = queryset.count()
+        queryset = apply_method_log_filters(LowCodeMethodCallLog.objects.all(), filter_params)
+
+        total_count = min(queryset.count(), EXPORT_EXCEL_MAX_RECORDS)
         if total_count == 0:
-            _set_progress(100)
-            cache.set(file_key, None, timeout=EXPORT_CACHE_TIMEOUT)
+            cache.set_many({progress_key: 100, file_key: None}, timeout=EXPORT_CACHE_TIMEOUT)
             logger.info(f"[OK] [Export Task {task_id}] No records to export.")
             return None
 
-        if total_count > EXPORT_MAX_RECORDS:
-            error_msg = f"导出记录数 ({total_count}) 超过最大限制 ({EXPORT_MAX_RECORDS})"
-            _set_error(error_msg)
-            raise ValueError(error_msg)
-
         _set_progress(20)
         logger.info(f"[OK] [Export Task {task_id}] Found {total_count} records to export.")
 
-        excel_buffer: BytesIO = generate_method_log_excel(queryset)
-        _set_progress(80)
-
-        filename = f"method_log_{uuid.uuid4().hex}.xlsx"
+        filename = f"method_log_{task_id}.xlsx"
         storage_path = _get_export_storage_path(filename)
 
-        with default_storage.open(storage_path, 'wb') as f:
-            f.write(excel_buffer.getvalue())
-        excel_buffer.close()
-
-        _set_progress(100)
-        cache.set(file_key, storage_path, timeout=EXPORT_CACHE_TIMEOUT)
+        # write-only 工作簿直接写入存储文件，不在内存中保留整份 Excel；写入进度映射到 20%~99%，
+        # 最多约 100 次进度写入（而非逐行写缓存）。
+        # 在事务内迭代：PostgreSQL 的 iterator() 使用普通服务端游标逐批拉取，
+        # 而非自动提交模式下的 WITH HOLD 游标（提交时会在服务端物化整个结果集）
+        with default_storage.open(storage_path, 'wb') as f, transaction.atomic(using=queryset.db):
+            generate_method_log_excel(
+                queryset, f,
+                progress_callback=lambda written: _set_progress(20 + written * 79 // total_count),
+                progress_every=max(1, total_count // 100),
+                max_rows=EXPORT_EXCEL_MAX_RECORDS
+            )
+
+        # 完成进度与文件路径一次往返写入
+        cache.set_many({progress_key: 100, file_key: storage_path}, timeout=EXPORT_CACHE_TIMEOUT)
 
         logger.info(f"[OK] [Export Task {task_id}] Export completed. File: {storage_path}")
         return storage_path